@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -34,6 +35,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "tracker.timing.ServerTimingMiddleware",
+    "tracker.query_detector.QueryDetectorMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -43,6 +46,27 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Доля запросов с замерами Server-Timing (от 0 до 1, 0 — замеры выключены)
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", 0))
+
+# Детектор N+1 и медленных запросов (для разработки и тестов)
+QUERY_DETECTOR = os.getenv("QUERY_DETECTOR", "False") == "True"
+# Строгий режим: находки вызывают ошибку вместо записи в отчет
+QUERY_DETECTOR_STRICT = os.getenv("QUERY_DETECTOR_STRICT", "False") == "True"
+QUERY_DETECTOR_REPEAT_THRESHOLD = int(os.getenv("QUERY_DETECTOR_REPEAT_THRESHOLD", 5))
+QUERY_DETECTOR_SLOW_MS = float(os.getenv("QUERY_DETECTOR_SLOW_MS", 100))
+QUERY_DETECTOR_REPORT = os.getenv("QUERY_DETECTOR_REPORT", "query_detector.jsonl")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "tracker.timing": {"handlers": ["console"], "level": "INFO"},
+        "tracker.query_detector": {"handlers": ["console"], "level": "WARNING"},
+    },
+}
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -65,7 +89,7 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
@@ -73,6 +97,27 @@ DATABASES = {
         "PORT": os.getenv("POSTGRES_PORT"),
     }
 }
+# Режим соединений с БД:
+# - close: новое соединение на каждый запрос (по умолчанию)
+# - persistent: соединение живет DB_CONN_MAX_AGE секунд и проверяется
+#   перед первым запросом к БД в каждом HTTP-запросе
+# - pool: пул соединений psycopg 3 (требуется пакет psycopg[binary,pool])
+DB_CONNECTIONS = os.getenv("DB_CONNECTIONS", "close")
+if DB_CONNECTIONS == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 600))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_CONNECTIONS == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    }
+elif DB_CONNECTIONS != "close":
+    raise ImproperlyConfigured(
+        "DB_CONNECTIONS: допустимые значения close, persistent, pool"
+    )
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -107,11 +152,32 @@ AUTH_USER_MODEL = "users.User"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Кэш (по умолчанию в памяти процесса; для нескольких процессов - файловый или общий)
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Кэш ответов публичных списков: алиас кэша и время жизни в секундах (0 - выключен)
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 60))
+# Статистика задач зависит от текущего времени (просрочка, сроки), поэтому хранится недолго
+TASK_STATISTICS_CACHE_TIMEOUT = int(os.getenv("TASK_STATISTICS_CACHE_TIMEOUT", 10))
+
 # django rest framework
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        (
+            # Пользователь из claims токена без запроса к БД
+            "users.authentication.StatelessJWTAuthentication"
+            if os.getenv("JWT_STATELESS_AUTH", "False") == "True"
+            else "rest_framework_simplejwt.authentication.JWTAuthentication"
+        ),
     ],
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
 }
@@ -119,8 +185,24 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "UPDATE_LAST_LOGIN": True,
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.RoleTokenObtainPairSerializer",
 }
 
+# Почта, признак суперпользователя и роль модератора в claims токена доступа
+# (проверки прав и аутентификация JWT_STATELESS_AUTH без обращения к БД)
+JWT_ROLE_CLAIM = os.getenv("JWT_ROLE_CLAIM", "True") == "True"
+# Время хранения роли пользователя в кэше, секунд
+ROLES_CACHE_TIMEOUT = int(os.getenv("ROLES_CACHE_TIMEOUT", 300))
+# Кэш ролей и claims роли используются только с общим для процессов кэшем.
+# Не задано - определяется по бэкенду (LocMemCache и DummyCache - не общие)
+ROLES_CACHE_SHARED = {"True": True, "False": False}.get(os.getenv("ROLES_CACHE_SHARED"))
+
+# При UPDATE_LAST_LOGIN время входа копится в памяти процесса и записывается пакетами
+# одним UPDATE: раз в LAST_LOGIN_FLUSH_INTERVAL секунд или при LAST_LOGIN_FLUSH_SIZE пользователей
+LAST_LOGIN_BUFFER = os.getenv("LAST_LOGIN_BUFFER", "False") == "True"
+LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", 5))
+LAST_LOGIN_FLUSH_SIZE = int(os.getenv("LAST_LOGIN_FLUSH_SIZE", 500))
+
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:8000").split(
     ","
 )  # frotend
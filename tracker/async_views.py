@@ -0,0 +1,163 @@
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from tracker.cache import response_cache
+from tracker.serializers import ImportantTaskSerializer
+from tracker.services import EmployeesWorkload
+from tracker.views import (EmployeeTasksAPIView, ImportantTasksAPIView,
+                           TaskListAPIView, TaskRetrieveAPIView)
+
+
+def render(data, status=200, headers=None):
+    """JSON-ответ в том же виде, что и у DRF"""
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+async def paginate(queryset, paginator, request):
+    """
+    Асинхронная постраничная выборка с параметрами PageNumberPagination.
+    Количество считается через acount(), страница читается через aiterator()
+    """
+    page_size = paginator.get_page_size(request)
+    try:
+        page_number = int(request.query_params.get(paginator.page_query_param, 1))
+    except ValueError:
+        page_number = 0
+
+    count = await queryset.acount()
+    last_page = max(math.ceil(count / page_size), 1)
+    if not 0 < page_number <= last_page:
+        raise NotFound("Некорректная страница.")
+
+    offset = (page_number - 1) * page_size
+    page = queryset[offset:][:page_size]
+    results = [obj async for obj in page.aiterator(chunk_size=page_size)]
+
+    url = request.build_absolute_uri()
+    param = paginator.page_query_param
+    next_link = previous_link = None
+    if page_number < last_page:
+        next_link = replace_query_param(url, param, page_number + 1)
+    if page_number == 2:
+        previous_link = remove_query_param(url, param)
+    elif page_number > 2:
+        previous_link = replace_query_param(url, param, page_number - 1)
+    return count, next_link, previous_link, results
+
+
+class AsyncReadView(View):
+    """
+    Базовый асинхронный View чтения.
+    Запрос к БД строится синхронным DRF View (view_class) с его фильтрами
+    и проверкой параметров, а выполняется через асинхронный ORM,
+    поэтому ожидание БД не занимает поток обработки запросов.
+    Аутентификация, права доступа и ограничение частоты запросов проверяются
+    view_class.initial() до кэша и выборки. Если cached, данные ответа кэшируются
+    в кэше ответов, как в CachedListMixin; условные запросы не поддерживаются.
+    """
+
+    view_class = None
+    cached = True
+
+    def get_view(self, request, **kwargs):
+        """DRF View, подготовленный как в APIView.dispatch()"""
+        view = self.view_class(args=(), kwargs=kwargs)
+        view.request = view.initialize_request(request, **kwargs)
+        view.headers = view.default_response_headers
+        return view
+
+    async def get(self, request, **kwargs):
+        view = self.get_view(request, **kwargs)
+        try:
+            await sync_to_async(view.initial)(view.request, **kwargs)
+            key = None
+            if self.cached and response_cache.enabled:
+                key = await sync_to_async(response_cache.make_key)(
+                    request.resolver_match.view_name, view.request
+                )
+                data = await sync_to_async(response_cache.get)(key)
+                if data is not None:
+                    return render(data, headers={"X-Cache": "HIT"})
+            data = await self.get_data(view)
+        except APIException as exc:
+            return await sync_to_async(self.handle_exception)(view, exc)
+
+        if key is None:
+            return render(data)
+        await sync_to_async(response_cache.set)(key, data)
+        return render(data, headers={"X-Cache": "MISS"})
+
+    @staticmethod
+    def handle_exception(view, exc):
+        """Ответ на ошибку так же, как у view_class (статус, заголовки, формат)"""
+        response = view.finalize_response(view.request, view.handle_exception(exc))
+        return response.render()
+
+    async def get_data(self, view):
+        raise NotImplementedError
+
+
+class AsyncListView(AsyncReadView):
+    """Асинхронный список с пагинацией view_class"""
+
+    async def get_data(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        count, next_link, previous_link, results = await paginate(
+            queryset, view.paginator, view.request
+        )
+        return {
+            "count": count,
+            "next": next_link,
+            "previous": previous_link,
+            "results": view.get_serializer(results, many=True).data,
+        }
+
+
+class AsyncTaskListView(AsyncListView):
+    """Асинхронная версия списка задач с фильтрами TaskFilterSet"""
+
+    view_class = TaskListAPIView
+
+
+class AsyncEmployeeTasksView(AsyncListView):
+    """Асинхронная версия списка сотрудников с задачами"""
+
+    view_class = EmployeeTasksAPIView
+
+
+class AsyncTaskRetrieveView(AsyncReadView):
+    """Асинхронная версия просмотра задачи"""
+
+    view_class = TaskRetrieveAPIView
+    cached = False
+
+    async def get_data(self, view):
+        task = await view.get_queryset().filter(pk=view.kwargs["pk"]).afirst()
+        if task is None:
+            raise NotFound("Задача не найдена.")
+        return view.get_serializer(task).data
+
+
+class AsyncImportantTasksView(AsyncReadView):
+    """Асинхронная версия списка важных задач с сотрудниками для их выполнения"""
+
+    view_class = ImportantTasksAPIView
+
+    async def get_data(self, view):
+        tasks = [task async for task in view.get_queryset().aiterator()]
+        workload = await EmployeesWorkload.aload()
+        serializer = ImportantTaskSerializer(
+            tasks, many=True, context={"request": view.request, "workload": workload}
+        )
+        return serializer.data
@@ -0,0 +1,215 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def request_digest(request):
+    """Хэш хоста, пути и отсортированных параметров запроса"""
+    params = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    return hashlib.md5(
+        repr((request.get_host(), request.path, params)).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+
+
+class CacheVersion:
+    """
+    Версия данных в кэше Django: входит в ключи значений, и ее увеличение
+    делает недействительными все ранее сохраненные значения.
+    Если версия вытеснена из кэша, она начинается с текущего времени,
+    чтобы не совпасть с версией уже сохраненных значений.
+    """
+
+    def __init__(self, key, alias=DEFAULT_CACHE_ALIAS):
+        self.key = key
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self):
+        version = self.cache.get(self.key)
+        if version is None:
+            self.cache.add(self.key, time.time_ns(), timeout=None)
+            version = self.cache.get(self.key)
+        return version
+
+    def invalidate(self):
+        """
+        Увеличивает версию сразу и после фиксации транзакции: иначе значение,
+        прочитанное до фиксации, могло бы попасть в новую версию
+        """
+        self.incr()
+        transaction.on_commit(self.incr)
+
+    def incr(self):
+        try:
+            self.cache.incr(self.key)
+        except ValueError:
+            self.get()
+
+
+class ResponseCache:
+    """
+    Кэш данных ответов публичных списков поверх кэша Django.
+    Ключ ответа включает поколение кэша: при изменении задач или сотрудников
+    поколение увеличивается, и все ранее сохраненные ответы перестают читаться
+    (устаревшие записи удаляет сам бэкенд кэша по таймауту или вытеснению).
+    Счетчики попаданий и промахов хранятся в том же кэше и общие для всех процессов.
+    """
+
+    prefix = "tracker:response"
+
+    @property
+    def cache(self):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    @property
+    def enabled(self):
+        return settings.RESPONSE_CACHE_TIMEOUT > 0
+
+    @property
+    def version(self):
+        return CacheVersion(f"{self.prefix}:generation", settings.RESPONSE_CACHE_ALIAS)
+
+    def generation(self):
+        return self.version.get()
+
+    def invalidate(self):
+        self.version.invalidate()
+
+    def incr(self, name):
+        """Увеличивает счетчик; если его успел добавить другой процесс, повторяет"""
+        key = f"{self.prefix}:{name}"
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+    def make_key(self, name, request):
+        """Ключ ответа по эндпоинту, адресу и параметрам запроса (включая страницу)"""
+        return f"{self.prefix}:{self.generation()}:{name}:{request_digest(request)}"
+
+    def get(self, key):
+        data = self.cache.get(key)
+        self.incr("misses" if data is None else "hits")
+        return data
+
+    def set(self, key, data, timeout=None):
+        self.cache.set(key, data, timeout=timeout or settings.RESPONSE_CACHE_TIMEOUT)
+
+    def remember(self, key, compute, timeout=None):
+        """Значение из кэша без учета в счетчиках; вычисляется, если его нет"""
+        if not self.enabled:
+            return compute()
+        value = self.cache.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, timeout)
+        return value
+
+    def stats(self):
+        values = self.cache.get_many(
+            [f"{self.prefix}:{name}" for name in ("hits", "misses")]
+        )
+        return {
+            "hits": values.get(f"{self.prefix}:hits", 0),
+            "misses": values.get(f"{self.prefix}:misses", 0),
+            "generation": self.generation(),
+        }
+
+    def reset_stats(self):
+        self.cache.delete_many([f"{self.prefix}:hits", f"{self.prefix}:misses"])
+
+
+response_cache = ResponseCache()
+
+
+class CachedListMixin:
+    """
+    Кэширует данные ответа list() для анонимных и авторизованных запросов одинаково:
+    использовать только для списков, не зависящих от пользователя
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not response_cache.enabled:
+            return super().list(request, *args, **kwargs)
+
+        key = response_cache.make_key(request.resolver_match.view_name, request)
+        data = response_cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы по ETag.
+    ETag вычисляется одним агрегатом max(updated_at) и COUNT(*) по выборке
+    (и запоминается в кэше ответов до изменения данных), поэтому ответ 304
+    отдается без выборки объектов и сериализации.
+    ETag включает поколение кэша ответов: каскадное SET NULL при удалении
+    родительской задачи или сотрудника, удаление задачи и выход задачи из фильтра
+    меняют ответ, не увеличивая max(updated_at). По той же причине Last-Modified
+    не отдается: If-Modified-Since вернул бы 304 для измененного ответа.
+    """
+
+    # Выключается в наследниках, где агрегат по всей выборке слишком дорог
+    conditional_get = True
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_etag(self, request):
+        def compute():
+            values = self.get_conditional_queryset().aggregate(
+                last_modified=Max("updated_at"), count=Count("pk")
+            )
+            etag = hashlib.md5(
+                repr(
+                    (
+                        request_digest(request),
+                        response_cache.generation(),
+                        values["count"],
+                        values["last_modified"],
+                    )
+                ).encode(),
+                usedforsecurity=False,
+            ).hexdigest()
+            return quote_etag(etag)
+
+        key = response_cache.make_key(
+            f"etag:{request.resolver_match.view_name}", request
+        )
+        return response_cache.remember(key, compute)
+
+    def get(self, request, *args, **kwargs):
+        if not self.conditional_get:
+            return super().get(request, *args, **kwargs)
+        etag = self.get_etag(request)
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response.headers.setdefault("ETag", etag)
+        return response
@@ -0,0 +1,51 @@
+from django.utils import timezone
+from django_filters import rest_framework as filters
+
+from tracker.models import ACTIVE_STATUSES, Task
+
+
+class TaskFilterSet(filters.FilterSet):
+    """
+    Фильтры списка задач. Каждое условие читается по индексу:
+    статус - (status, deadline), исполнитель и родительская задача - индексы
+    внешних ключей, срок и просрочка - (deadline, id) и (status, deadline),
+    дата изменения - (updated_at). Исключение - overdue=false: это большая часть
+    задач, и последовательное чтение для нее дешевле индекса
+    """
+
+    status = filters.MultipleChoiceFilter(
+        choices=Task.STATUS_CHOICES, method="filter_status"
+    )
+    executor = filters.NumberFilter(field_name="executor_id")
+    parent_task = filters.NumberFilter(field_name="parent_task_id")
+    deadline_after = filters.IsoDateTimeFilter(field_name="deadline", lookup_expr="gte")
+    deadline_before = filters.IsoDateTimeFilter(
+        field_name="deadline", lookup_expr="lte"
+    )
+    overdue = filters.BooleanFilter(method="filter_overdue")
+    updated_since = filters.IsoDateTimeFilter(
+        field_name="updated_at", lookup_expr="gte"
+    )
+
+    class Meta:
+        model = Task
+        fields = (
+            "status",
+            "executor",
+            "parent_task",
+            "deadline_after",
+            "deadline_before",
+            "overdue",
+            "updated_since",
+        )
+
+    def filter_status(self, queryset, name, value):
+        """Одно условие IN вместо OR по каждому статусу и без DISTINCT"""
+        return queryset.filter(status__in=value)
+
+    def filter_overdue(self, queryset, name, value):
+        """Просроченные задачи: срок прошел, задача не завершена и не отменена"""
+        condition = {"status__in": ACTIVE_STATUSES, "deadline__lt": timezone.now()}
+        if value:
+            return queryset.filter(**condition)
+        return queryset.exclude(**condition)
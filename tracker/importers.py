@@ -0,0 +1,453 @@
+import csv
+import io
+import json
+from collections import Counter
+from itertools import islice
+from types import SimpleNamespace
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from tracker.models import Employee, Task, TaskCounter
+from tracker.signals import data_changed
+from tracker.validators import (validate_deadline_not_in_past,
+                                validate_deadline_with_parent,
+                                validate_status_on_creation)
+from users.models import User
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# Сколько ошибок выводить при отказе в загрузке
+MAX_REPORTED_ERRORS = 20
+
+# Размер порции id для запросов к БД
+LOOKUP_CHUNK_SIZE = 10000
+
+# Валидаторам задач нужен "сериализатор" без instance - задача создается
+NEW_TASK = SimpleNamespace(instance=None)
+
+
+class ImportValidationError(Exception):
+    """Ошибки в загружаемых данных"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"Ошибок в данных: {len(errors)}")
+
+
+class TaskRecord:
+    """Строка загружаемой задачи"""
+
+    __slots__ = (
+        "line",
+        "ref",
+        "title",
+        "description",
+        "parent_ref",
+        "parent_index",
+        "parent_id",
+        "executor_ref",
+        "executor_id",
+        "deadline",
+        "status",
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+
+def read_rows(path, import_format=None):
+    """
+    Читает файл NDJSON или CSV.
+    :returns: генератор пар (номер строки, словарь значений)
+    """
+    if import_format is None:
+        import_format = "csv" if str(path).lower().endswith(".csv") else "ndjson"
+    with open(path, encoding="utf-8", newline="") as file:
+        if import_format == "csv":
+            # Первая строка CSV - заголовок
+            yield from enumerate(csv.DictReader(file), start=2)
+            return
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise ImportValidationError(
+                    [f"Строка {line}: некорректный JSON ({exc})"]
+                )
+
+
+def clean(value):
+    """Пустые значения (в том числе пустые строки CSV) приводятся к None"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def to_ref(value):
+    """Ссылка на строку файла или запись БД в виде строки"""
+    value = clean(value)
+    return None if value is None else str(value)
+
+
+def in_chunks(items, size):
+    """Разбивает items на списки не длиннее size"""
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def existing_ids(model, ids):
+    """id из ids, которые есть в БД, - по одному запросу на порцию"""
+    found = set()
+    for chunk in in_chunks(ids, LOOKUP_CHUNK_SIZE):
+        found.update(model.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+    return found
+
+
+def copy_rows(model, columns, rows, batch_size):
+    """
+    Загружает строки командой COPY во временную таблицу
+    и переносит их в таблицу модели одним INSERT ... SELECT (PostgreSQL)
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    staging = quote(f"{model._meta.db_table}_import")
+    column_list = ", ".join(quote(column) for column in columns)
+    copy_sql = f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) "
+            "ON COMMIT DROP"
+        )
+        for batch in in_chunks(rows, batch_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            buffer.seek(0)
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, "copy_expert"):
+                # psycopg2
+                raw_cursor.copy_expert(copy_sql, buffer)
+            else:
+                # psycopg 3
+                with raw_cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+        cursor.execute(
+            f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging}"
+        )
+        cursor.execute(f"DROP TABLE {staging}")
+
+
+def reserve_ids(model, count):
+    """Получает count значений последовательности первичного ключа (PostgreSQL)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class Importer:
+    """
+    Загрузка сотрудников и задач из файлов NDJSON/CSV.
+    Ссылки id, parent_task и executor сначала ищутся среди строк файлов,
+    затем среди записей БД. Все строки проверяются до записи в БД,
+    при ошибках ничего не загружается.
+    На PostgreSQL данные загружаются через COPY во временную таблицу,
+    на других БД - через bulk_create порциями.
+    """
+
+    def __init__(self, batch_size=10000, use_copy=None):
+        self.batch_size = batch_size
+        if use_copy is None:
+            use_copy = connection.vendor == "postgresql"
+        self.use_copy = use_copy
+        self.errors = []
+        # id сотрудника в файле -> id в БД
+        self.employee_refs = {}
+
+    def error(self, line, message):
+        self.errors.append(f"Строка {line}: {message}")
+
+    def run(self, employees=None, tasks=None):
+        """
+        Загружает строки сотрудников и задач в одной транзакции.
+        :param employees: итератор пар (номер строки, словарь) сотрудников
+        :param tasks: итератор пар (номер строки, словарь) задач
+        :returns: количество загруженных сотрудников и задач
+        """
+        with transaction.atomic():
+            employees_count = tasks_count = 0
+            if employees is not None:
+                records = self.parse_employees(employees)
+                self.raise_errors()
+                employees_count = self.load_employees(records)
+            if tasks is not None:
+                records = self.parse_tasks(tasks)
+                self.raise_errors()
+                tasks_count = self.load_tasks(records)
+        return employees_count, tasks_count
+
+    def raise_errors(self):
+        if self.errors:
+            raise ImportValidationError(self.errors)
+
+    def parse_employees(self, rows):
+        records = []
+        for line, row in rows:
+            full_name = clean(row.get("full_name"))
+            position = clean(row.get("position"))
+            user = clean(row.get("user"))
+            if not full_name:
+                self.error(line, "не указано ФИО сотрудника")
+            elif len(full_name) > 200:
+                self.error(line, "ФИО длиннее 200 символов")
+            if position and len(position) > 250:
+                self.error(line, "должность длиннее 250 символов")
+            if user is not None:
+                try:
+                    user = int(user)
+                except (TypeError, ValueError):
+                    self.error(line, f"некорректный пользователь {user!r}")
+            records.append((line, to_ref(row.get("id")), full_name, position, user))
+
+        users = existing_ids(
+            User, {user for *_, user in records if isinstance(user, int)}
+        )
+        for line, _, _, _, user in records:
+            if isinstance(user, int) and user not in users:
+                self.error(line, f"пользователь {user} не найден")
+        return records
+
+    def load_employees(self, records):
+        if self.use_copy:
+            ids = reserve_ids(Employee, len(records))
+            copy_rows(
+                Employee,
+                ("id", "user_id", "full_name", "position"),
+                [
+                    (pk, user, full_name, position)
+                    for pk, (_, _, full_name, position, user) in zip(ids, records)
+                ],
+                self.batch_size,
+            )
+        else:
+            employees = Employee.objects.bulk_create(
+                (
+                    Employee(user_id=user, full_name=full_name, position=position)
+                    for _, _, full_name, position, user in records
+                ),
+                batch_size=self.batch_size,
+            )
+            ids = [employee.pk for employee in employees]
+        data_changed.send(sender=Employee)
+
+        for pk, (_, ref, *_) in zip(ids, records):
+            if ref is not None:
+                self.employee_refs[ref] = pk
+        return len(records)
+
+    def parse_tasks(self, rows):
+        statuses = dict(Task.STATUS_CHOICES)
+        records = []
+        for line, row in rows:
+            record = TaskRecord(
+                line=line,
+                ref=to_ref(row.get("id")),
+                title=clean(row.get("title")),
+                description=clean(row.get("description")),
+                parent_ref=to_ref(row.get("parent_task")),
+                executor_ref=to_ref(row.get("executor")),
+                status=clean(row.get("status")) or "new",
+            )
+            if not record.title:
+                self.error(line, "не указано название задачи")
+            elif len(record.title) > 128:
+                self.error(line, "название задачи длиннее 128 символов")
+            if record.status not in statuses:
+                self.error(line, f"неизвестный статус {record.status!r}")
+
+            deadline = clean(row.get("deadline"))
+            if deadline is not None:
+                try:
+                    record.deadline = parse_datetime(str(deadline))
+                except ValueError:
+                    pass
+                if record.deadline is None:
+                    self.error(line, f"некорректный срок {deadline!r}")
+                elif timezone.is_naive(record.deadline):
+                    record.deadline = timezone.make_aware(record.deadline)
+            records.append(record)
+
+        self.resolve_references(records)
+        if not self.errors:
+            self.validate_tasks(records)
+        return records
+
+    def resolve_references(self, records):
+        """Находит родительские задачи и исполнителей в файле или в БД"""
+        index_by_ref = {}
+        for index, record in enumerate(records):
+            if record.ref is None:
+                continue
+            if record.ref in index_by_ref:
+                self.error(record.line, f"повторяется id {record.ref}")
+            index_by_ref[record.ref] = index
+
+        db_parents = set()
+        db_executors = set()
+        for record in records:
+            if record.parent_ref is not None:
+                record.parent_index = index_by_ref.get(record.parent_ref)
+                if record.parent_index is None:
+                    record.parent_id = self.to_db_id(record, record.parent_ref)
+                    db_parents.add(record.parent_id)
+            if record.executor_ref is not None:
+                record.executor_id = self.employee_refs.get(record.executor_ref)
+                if record.executor_id is None:
+                    record.executor_id = self.to_db_id(record, record.executor_ref)
+                    db_executors.add(record.executor_id)
+
+        # Сроки родительских задач из БД загружаются порциями
+        self.parent_deadlines = {}
+        for chunk in in_chunks(db_parents - {None}, LOOKUP_CHUNK_SIZE):
+            self.parent_deadlines.update(
+                Task.objects.filter(pk__in=chunk).values_list("pk", "deadline")
+            )
+        executors = existing_ids(Employee, db_executors - {None})
+
+        for record in records:
+            if record.parent_id is not None and (
+                record.parent_id not in self.parent_deadlines
+            ):
+                self.error(record.line, f"задача {record.parent_ref} не найдена")
+            if record.executor_ref is not None and record.executor_id is not None:
+                if (
+                    record.executor_ref not in self.employee_refs
+                    and record.executor_id not in executors
+                ):
+                    self.error(
+                        record.line, f"сотрудник {record.executor_ref} не найден"
+                    )
+        self.check_cycles(records)
+
+    def to_db_id(self, record, ref):
+        try:
+            return int(ref)
+        except ValueError:
+            self.error(record.line, f"ссылка {ref!r} не найдена")
+            return None
+
+    def check_cycles(self, records):
+        """Проверяет, что родительские задачи в файле не образуют цикл"""
+        # 0 - не проверена, 1 - в текущей цепочке, 2 - без цикла
+        state = [0] * len(records)
+        for start in range(len(records)):
+            chain = []
+            index = start
+            while index is not None and state[index] == 0:
+                state[index] = 1
+                chain.append(index)
+                index = records[index].parent_index
+            if index is not None and state[index] == 1:
+                self.error(records[index].line, "цикл в родительских задачах")
+            for item in chain:
+                state[item] = 2
+
+    def validate_tasks(self, records):
+        """Правила tracker/validators.py для всех задач файла"""
+        for record in records:
+            if record.parent_index is not None:
+                parent_deadline = records[record.parent_index].deadline
+            else:
+                parent_deadline = self.parent_deadlines.get(record.parent_id)
+            values = {
+                "deadline": record.deadline,
+                "status": record.status,
+                "parent_task": (
+                    SimpleNamespace(deadline=parent_deadline)
+                    if record.parent_ref is not None
+                    else None
+                ),
+            }
+            try:
+                validate_deadline_not_in_past(values)
+                validate_deadline_with_parent(values)
+                validate_status_on_creation(NEW_TASK, values)
+            except serializers.ValidationError as exc:
+                self.error(record.line, " ".join(map(str, exc.detail)))
+
+    def load_tasks(self, records):
+        now = timezone.now()
+        if self.use_copy:
+            ids = reserve_ids(Task, len(records))
+            copy_rows(
+                Task,
+                (
+                    "id",
+                    "title",
+                    "description",
+                    "parent_task_id",
+                    "executor_id",
+                    "deadline",
+                    "status",
+                    "created_at",
+                    "updated_at",
+                ),
+                [
+                    (
+                        pk,
+                        record.title,
+                        record.description,
+                        (
+                            ids[record.parent_index]
+                            if record.parent_index is not None
+                            else record.parent_id
+                        ),
+                        record.executor_id,
+                        record.deadline and record.deadline.isoformat(),
+                        record.status,
+                        now.isoformat(),
+                        now.isoformat(),
+                    )
+                    for pk, record in zip(ids, records)
+                ],
+                self.batch_size,
+            )
+            TaskCounter.objects.apply_deltas(
+                Counter(
+                    (record.executor_id, record.status)
+                    for record in records
+                    if record.executor_id is not None
+                )
+            )
+            data_changed.send(sender=Task)
+            return len(records)
+
+        tasks = [
+            Task(
+                title=record.title,
+                description=record.description,
+                parent_task_id=record.parent_id,
+                executor_id=record.executor_id,
+                deadline=record.deadline,
+                status=record.status,
+            )
+            for record in records
+        ]
+        for task, record in zip(tasks, records):
+            if record.parent_index is not None:
+                task.parent_task = tasks[record.parent_index]
+        Task.objects.bulk_create_tree(tasks, batch_size=self.batch_size)
+        return len(tasks)
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tracker.services import apply_assignment_plan, assignment_plan
+
+
+class Command(BaseCommand):
+    """Сбалансированное распределение важных задач между сотрудниками"""
+
+    help = (
+        "Строит план распределения важных задач между сотрудниками "
+        "и с --apply назначает исполнителей одним UPDATE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--apply", action="store_true", help="Назначить исполнителей по плану"
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            assignments = assignment_plan()
+            elapsed = time.perf_counter() - start
+            if options["verbosity"] > 1:
+                for assignment in assignments:
+                    self.stdout.write(
+                        f"{assignment['task']} {assignment['title']} -> "
+                        f"{assignment['full_name']}"
+                    )
+            executors = {assignment["executor"] for assignment in assignments}
+            self.stdout.write(
+                f"Задач: {len(assignments)}, сотрудников: {len(executors)}, "
+                f"план построен за {elapsed * 1000:.1f} мс"
+            )
+            if options["apply"]:
+                updated = apply_assignment_plan(assignments)
+                self.stdout.write(f"Назначено задач: {updated}")
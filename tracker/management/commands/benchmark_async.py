@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import reverse
+
+# Пары эндпоинтов чтения: синхронный DRF View и его асинхронная версия
+ENDPOINTS = {
+    "task-list": ("tracker:task-list", "tracker:async-task-list"),
+    "employee-tasks": (
+        "tracker:employee-tasks-list",
+        "tracker:async-employee-tasks-list",
+    ),
+    "important-tasks": (
+        "tracker:important-tasks-list",
+        "tracker:async-important-tasks-list",
+    ),
+}
+
+
+async def asgi_get(application, path):
+    """
+    Выполняет GET-запрос к ASGI-приложению в том же процессе.
+    :returns: HTTP-статус ответа
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    disconnected = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+async def run_clients(application, path, clients, requests):
+    """
+    Запускает clients конкурентных клиентов, которые вместе выполняют
+    requests запросов.
+    :returns: общее время, задержки запросов и количество ошибок
+    """
+    remaining = iter(range(requests))
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            if await asgi_get(application, path) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+class Command(BaseCommand):
+    """Сравнение пропускной способности синхронных и асинхронных эндпоинтов чтения"""
+
+    help = (
+        "Сравнивает пропускную способность синхронного и асинхронного эндпоинта "
+        "чтения под ASGI при заданном количестве конкурентных клиентов. "
+        "Запросы выполняются в процессе к текущей БД, данные не изменяются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", choices=tuple(ENDPOINTS), default="task-list")
+        parser.add_argument("--clients", type=int, default=500)
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Выключить кэш ответов, чтобы каждый запрос обращался к БД",
+        )
+
+    def handle(self, *args, **options):
+        if options["no_cache"]:
+            with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+                return self.run(options)
+        return self.run(options)
+
+    def run(self, options):
+        application = ASGIHandler()
+        for mode, url_name in zip(("sync", "async"), ENDPOINTS[options["endpoint"]]):
+            elapsed, latencies, errors = asyncio.run(
+                run_clients(
+                    application,
+                    reverse(url_name),
+                    options["clients"],
+                    options["requests"],
+                )
+            )
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[int(len(latencies) * 0.95)]
+            self.stdout.write(
+                f"{mode}: {len(latencies) / elapsed:.1f} запросов/с, "
+                f"p50 {p50 * 1000:.1f} мс, p95 {p95 * 1000:.1f} мс, "
+                f"ошибок {errors}"
+            )
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from tracker.views import EmployeeViewSet, TaskListAPIView
+from users.authentication import StatelessJWTAuthentication
+from users.models import User
+from users.serializers import RoleTokenObtainPairSerializer
+
+AUTHENTICATION_CLASSES = {
+    "JWTAuthentication": JWTAuthentication,
+    "StatelessJWTAuthentication": StatelessJWTAuthentication,
+}
+
+
+def make_views(authentication_class):
+    """View списков задач и сотрудников с заданным классом аутентификации"""
+    kwargs = {"authentication_classes": (authentication_class,)}
+    return {
+        "tracker:task-list": TaskListAPIView.as_view(**kwargs),
+        "tracker:employees-list": EmployeeViewSet.as_view({"get": "list"}, **kwargs),
+    }
+
+
+class Command(BaseCommand):
+    """Сравнение аутентификации JWT с загрузкой пользователя и без нее"""
+
+    help = (
+        "Сравнивает количество запросов и время чтения списков задач и сотрудников "
+        "с JWTAuthentication и StatelessJWTAuthentication. "
+        "Пользователь создается в транзакции и откатывается."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        with transaction.atomic():
+            user = User.objects.create_user(email="benchmark@example.com")
+            token = RoleTokenObtainPairSerializer.get_token(user).access_token
+            header = f"Bearer {token}"
+
+            for name, authentication_class in AUTHENTICATION_CLASSES.items():
+                for view_name, view in make_views(authentication_class).items():
+                    path = reverse(view_name)
+
+                    def call():
+                        request = factory.get(path, HTTP_AUTHORIZATION=header)
+                        request.resolver_match = resolve(path)
+                        response = view(request)
+                        response.render()
+                        return response
+
+                    # Первый запрос заполняет кэши, затем считаются запросы к БД
+                    call()
+                    with CaptureQueriesContext(connection) as queries:
+                        call()
+                    start = time.perf_counter()
+                    for _ in range(options["requests"]):
+                        call()
+                    elapsed = (time.perf_counter() - start) / options["requests"]
+                    self.stdout.write(
+                        f"{name} {path}: запросов к БД {len(queries)}, "
+                        f"среднее {elapsed * 1000:.2f} мс"
+                    )
+            transaction.set_rollback(True)
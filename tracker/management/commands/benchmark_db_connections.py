@@ -0,0 +1,85 @@
+import importlib.util
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+# Настройки соединения для каждого режима DB_CONNECTIONS
+MODES = {
+    "close": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True},
+    "pool": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+}
+
+
+def pool_unavailable(settings_dict):
+    """:returns: причина, по которой пул соединений недоступен, или None"""
+    if settings_dict["ENGINE"] != "django.db.backends.postgresql":
+        return "пул доступен только для PostgreSQL"
+    if importlib.util.find_spec("psycopg_pool") is None:
+        return "не установлен пакет psycopg[pool]"
+    return None
+
+
+def make_connection(settings_dict, mode):
+    """Отдельное соединение с настройками режима, не затрагивающее connections"""
+    options = {
+        key: value for key, value in settings_dict["OPTIONS"].items() if key != "pool"
+    }
+    if mode == "pool":
+        options["pool"] = {"min_size": 1, "max_size": 1}
+    settings_dict = {**settings_dict, **MODES[mode], "OPTIONS": options}
+    backend = load_backend(settings_dict["ENGINE"])
+    return backend.DatabaseWrapper(settings_dict, alias=f"benchmark-{mode}")
+
+
+def request_cycle(connection):
+    """Работа с БД за один HTTP-запрос: как при request_started и request_finished"""
+    connection.close_if_unusable_or_obsolete()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    connection.close_if_unusable_or_obsolete()
+
+
+class Command(BaseCommand):
+    """Сравнение накладных расходов на соединение с БД в режимах DB_CONNECTIONS"""
+
+    help = (
+        "Измеряет время работы с БД за один запрос (соединение и SELECT 1) "
+        "в режимах close, persistent и pool для БД default."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--mode", action="append", choices=tuple(MODES), dest="modes"
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connections["default"].settings_dict
+        for mode in options["modes"] or MODES:
+            reason = mode == "pool" and pool_unavailable(settings_dict)
+            if reason:
+                self.stdout.write(f"{mode}: пропущен, {reason}")
+                continue
+
+            connection = make_connection(settings_dict, mode)
+            timings = []
+            try:
+                for _ in range(options["requests"]):
+                    start = time.perf_counter()
+                    request_cycle(connection)
+                    timings.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+                if mode == "pool":
+                    connection.close_pool()
+
+            timings.sort()
+            self.stdout.write(
+                f"{mode}: среднее {sum(timings) / len(timings) * 1000:.2f} мс, "
+                f"p50 {timings[len(timings) // 2] * 1000:.2f} мс, "
+                f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} мс"
+            )
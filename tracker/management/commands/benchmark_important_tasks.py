@@ -0,0 +1,88 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from tracker.models import Task
+
+
+def legacy_important_tasks():
+    """Прежняя формулировка важных задач: OR по двум соединениям и DISTINCT"""
+    return (
+        Task.objects.filter(status="new", parent_task__isnull=False)
+        .filter(
+            Q(parent_task__status="in_progress")
+            | Q(parent_task__subtasks__status="in_progress")
+        )
+        .distinct()
+    )
+
+
+def generate_hierarchy(tasks_count, siblings, seed=None):
+    """
+    Создает иерархию задач: корневые задачи с широкими наборами подзадач.
+    :returns: количество созданных задач
+    """
+    rnd = random.Random(seed)
+    statuses = [status for status, _ in Task.STATUS_CHOICES]
+    roots = Task.objects.bulk_create(
+        Task(title=f"Root {i}", status=rnd.choice(statuses))
+        for i in range(max(tasks_count // (siblings + 1), 1))
+    )
+    subtasks = Task.objects.bulk_create(
+        (
+            Task(
+                title=f"Subtask {i}",
+                parent_task=rnd.choice(roots),
+                status=rnd.choice(statuses),
+            )
+            for i in range(tasks_count - len(roots))
+        ),
+        batch_size=1000,
+    )
+    return len(roots) + len(subtasks)
+
+
+class Command(BaseCommand):
+    """Сравнение формулировок запроса важных задач на сгенерированной иерархии"""
+
+    help = (
+        "Сравнивает время запроса важных задач (EXISTS) с прежней формулировкой "
+        "(OR + DISTINCT). Данные создаются в транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=20000)
+        parser.add_argument("--siblings", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = generate_hierarchy(
+                options["tasks"], options["siblings"], options["seed"]
+            )
+            self.stdout.write(f"Создано задач: {created}")
+
+            results = {}
+            for name, queryset in (
+                ("OR + DISTINCT", legacy_important_tasks),
+                ("EXISTS", Task.objects.important),
+            ):
+                timings = []
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    ids = set(queryset().values_list("pk", flat=True))
+                    timings.append(time.perf_counter() - start)
+                results[name] = ids
+                self.stdout.write(
+                    f"{name}: задач {len(ids)}, "
+                    f"лучшее {min(timings) * 1000:.1f} мс, "
+                    f"среднее {sum(timings) / len(timings) * 1000:.1f} мс"
+                )
+            transaction.set_rollback(True)
+
+        if len(set(map(frozenset, results.values()))) != 1:
+            raise CommandError("Результаты формулировок различаются")
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from tracker.services import EXPORT_FORMATS, stream_tasks
+from tracker.views import TaskExportAPIView
+
+
+def filter_tasks(filters):
+    """Применяет к задачам фильтры списка задач, как к параметрам запроса"""
+    view = TaskExportAPIView()
+    view.request = Request(RequestFactory().get("/", filters))
+    view.format_kwarg = None
+    view.kwargs = {}
+    try:
+        return view.filter_queryset(view.get_queryset())
+    except ValidationError as exc:
+        errors = "; ".join(
+            f"{name}: {' '.join(map(str, messages))}"
+            for name, messages in exc.detail.items()
+        )
+        raise CommandError(f"Некорректные фильтры. {errors}")
+
+
+class Command(BaseCommand):
+    """Потоковая выгрузка задач в NDJSON или CSV"""
+
+    help = "Выгружает задачи в NDJSON или CSV с фильтрами списка задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=tuple(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--output", help="Файл для выгрузки (по умолчанию stdout)")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="Фильтр списка задач, можно указать несколько раз",
+        )
+
+    def handle(self, *args, **options):
+        filters = {}
+        for item in options["filter"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"Фильтр должен иметь вид NAME=VALUE: {item}")
+            filters.setdefault(name, []).append(value)
+
+        lines = stream_tasks(
+            filter_tasks(filters), options["format"], options["chunk_size"]
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.importers import (IMPORT_FORMATS, MAX_REPORTED_ERRORS, Importer,
+                               ImportValidationError, read_rows)
+
+
+class Command(BaseCommand):
+    """Загрузка сотрудников и задач из NDJSON или CSV"""
+
+    help = (
+        "Загружает сотрудников и задачи из файлов NDJSON или CSV. "
+        "На PostgreSQL используется COPY, на других БД - bulk_create порциями."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", help="Файл сотрудников")
+        parser.add_argument("--tasks", help="Файл задач")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Формат файлов (по умолчанию по расширению .csv, иначе NDJSON)",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--no-copy", action="store_true", help="Не использовать COPY на PostgreSQL"
+        )
+
+    def handle(self, *args, **options):
+        if not options["employees"] and not options["tasks"]:
+            raise CommandError("Укажите файл сотрудников и/или задач")
+        if options["batch_size"] <= 0:
+            raise CommandError("Размер порции должен быть положительным")
+
+        importer = Importer(
+            batch_size=options["batch_size"],
+            use_copy=False if options["no_copy"] else None,
+        )
+        try:
+            employees, tasks = importer.run(
+                employees=self.read(options["employees"], options["format"]),
+                tasks=self.read(options["tasks"], options["format"]),
+            )
+        except ImportValidationError as exc:
+            for message in exc.errors[:MAX_REPORTED_ERRORS]:
+                self.stderr.write(message)
+            raise CommandError(f"Данные не загружены. {exc}")
+        except OSError as exc:
+            raise CommandError(f"Не удалось прочитать файл: {exc}")
+        self.stdout.write(f"Загружено сотрудников: {employees}, задач: {tasks}")
+
+    @staticmethod
+    def read(path, import_format):
+        return None if path is None else read_rows(path, import_format)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.models import TaskCounter
+
+
+class Command(BaseCommand):
+    """Пересчет и проверка счетчиков задач сотрудников"""
+
+    help = "Пересчитывает счетчики задач сотрудников по таблице задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить счетчики, не изменяя их",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = TaskCounter.objects.mismatches()
+        for (employee_id, status), (actual, expected) in sorted(mismatches.items()):
+            self.stdout.write(
+                f"Сотрудник {employee_id}, статус {status}: "
+                f"счетчик {actual}, задач {expected}"
+            )
+
+        if options["check"]:
+            if mismatches:
+                raise CommandError(f"Расхождений в счетчиках: {len(mismatches)}")
+            self.stdout.write(self.style.SUCCESS("Счетчики задач в порядке"))
+            return
+
+        count = TaskCounter.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Счетчики задач пересчитаны, записей: {count}")
+        )
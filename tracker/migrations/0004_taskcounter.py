@@ -0,0 +1,86 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_task_counters(apps, schema_editor):
+    """Заполняет счетчики задач по существующим задачам"""
+    Task = apps.get_model("tracker", "Task")
+    TaskCounter = apps.get_model("tracker", "TaskCounter")
+    groups = (
+        Task.objects.order_by()
+        .filter(executor__isnull=False)
+        .values_list("executor_id", "status")
+        .annotate(task_count=Count("id"))
+    )
+    TaskCounter.objects.bulk_create(
+        [
+            TaskCounter(employee_id=executor_id, status=status, count=count)
+            for executor_id, status, count in groups
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0003_alter_task_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "Новая"),
+                            ("in_progress", "В работе"),
+                            ("on_review", "На проверке"),
+                            ("completed", "Завершена"),
+                            ("canceled", "Отменена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "count",
+                    models.IntegerField(default=0, verbose_name="Количество задач"),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_counters",
+                        to="tracker.employee",
+                        verbose_name="Сотрудник",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счетчик задач",
+                "verbose_name_plural": "Счетчики задач",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("employee", "status"),
+                        name="unique_employee_status_counter",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from tracker.search import drop_search_index, ensure_search_index
+
+
+def create_search_index(apps, schema_editor):
+    ensure_search_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Полнотекстовый поиск задач: вычисляемый столбец tsvector с GIN-индексом
+    на PostgreSQL, индекс FTS5 с триггерами на SQLite
+    """
+
+    dependencies = [
+        ("tracker", "0005_task_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -1,9 +1,42 @@
-from django.db import models
+import itertools
+from collections import Counter
 
+from django.db import connections, models, transaction
+from django.db.models import Count, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tracker.search import search_expressions, search_words
+from tracker.signals import data_changed
 from users.models import User
 
 NULLABLE = {"null": True, "blank": True}
 
+# Поля задачи, от которых зависят счетчики задач сотрудников
+COUNTED_FIELDS = {"executor", "executor_id", "status"}
+
+# Статусы незавершенных задач (для них срок может быть просрочен)
+ACTIVE_STATUSES = ("new", "in_progress", "on_review")
+
+# Ограничение глубины обхода дерева задач (защита от циклов в parent_task)
+MAX_TREE_DEPTH = 100
+
+
+class EmployeeQuerySet(models.QuerySet):
+    """QuerySet сотрудников"""
+
+    def with_task_count(self, status="in_progress", name="active_task_count"):
+        """
+        Добавляет количество задач сотрудника в статусе status
+        из счетчиков задач без подсчета по таблице задач (без GROUP BY).
+        Счетчик читается коррелированным подзапросом по уникальному индексу
+        (сотрудник, статус); сортировка по нему выполняется над всеми сотрудниками
+        """
+        counter = TaskCounter.objects.filter(
+            employee=OuterRef("pk"), status=status
+        ).values("count")[:1]
+        return self.annotate(**{name: Coalesce(Subquery(counter), Value(0))})
+
 
 class Employee(models.Model):
     """Модель сотрудника"""
@@ -23,6 +56,8 @@ class Employee(models.Model):
         help_text="Укажите должность работника",
     )
 
+    objects = EmployeeQuerySet.as_manager()
+
     def __str__(self):
         return f"Сотрудник: {self.full_name}, должность: {self.position}"
 
@@ -32,6 +67,228 @@ class Employee(models.Model):
         ordering = ("full_name",)
 
 
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet задач, поддерживающий счетчики задач сотрудников
+    при массовых операциях
+    """
+
+    def counter_groups(self):
+        """Количество задач по парам (исполнитель, статус)"""
+        groups = (
+            self.order_by()
+            .filter(executor__isnull=False)
+            .values_list("executor_id", "status")
+            .annotate(task_count=Count("id"))
+        )
+        return Counter(
+            {(executor_id, status): count for executor_id, status, count in groups}
+        )
+
+    def lock(self):
+        """
+        Блокирует задачи выборки до конца транзакции (SELECT ... FOR UPDATE
+        в порядке id): счетчики считаются и изменяются по тем же строкам,
+        которые не изменит конкурирующий Task.save().
+        :returns: QuerySet заблокированных задач по списку id
+        """
+        pks = list(self.select_for_update().order_by("pk").values_list("pk", flat=True))
+        return self.model.objects.filter(pk__in=pks)
+
+    def update(self, **kwargs):
+        # QuerySet.bulk_update() выполняет этот же update() для каждой порции
+        if not COUNTED_FIELDS & kwargs.keys():
+            rows = super().update(**kwargs)
+            data_changed.send(sender=self.model)
+            return rows
+
+        executor_id = kwargs.get("executor_id", kwargs.get("executor"))
+        if isinstance(executor_id, models.Model):
+            executor_id = executor_id.pk
+        is_expression = any(
+            hasattr(kwargs.get(field), "resolve_expression") for field in COUNTED_FIELDS
+        )
+
+        with transaction.atomic(using=self.db):
+            tasks = self.lock()
+            old_groups = tasks.counter_groups()
+            rows = super(TaskQuerySet, tasks).update(**kwargs)
+            if is_expression:
+                # Новые значения вычисляет БД: пересчитываем по затронутым задачам
+                new_groups = tasks.counter_groups()
+            else:
+                executor_changed = "executor" in kwargs or "executor_id" in kwargs
+                new_groups = Counter()
+                for (old_executor_id, status), count in old_groups.items():
+                    new_executor_id = (
+                        executor_id if executor_changed else old_executor_id
+                    )
+                    new_groups[(new_executor_id, kwargs.get("status", status))] += count
+            new_groups.subtract(old_groups)
+            TaskCounter.objects.apply_deltas(new_groups)
+        data_changed.send(sender=self.model)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+                # Неизвестно, какие строки были вставлены: пересчитываем
+                TaskCounter.objects.rebuild(
+                    employee_ids={obj.executor_id for obj in objs}
+                )
+            else:
+                TaskCounter.objects.apply_deltas(
+                    Counter(
+                        (obj.executor_id, obj.status)
+                        for obj in created
+                        if obj.executor_id
+                    )
+                )
+        data_changed.send(sender=self.model)
+        return created
+
+    bulk_create.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            tasks = self.lock()
+            old_groups = tasks.counter_groups()
+            result = super(TaskQuerySet, tasks).delete()
+            TaskCounter.objects.apply_deltas(
+                {key: -count for key, count in old_groups.items()}
+            )
+        return result
+
+    delete.alters_data = True
+
+    def assign_executors(self, executors):
+        """
+        Назначает исполнителей задачам одним UPDATE, соединенным со списком
+        значений (id задачи, id сотрудника): CASE с веткой на каждого сотрудника
+        вычисляется для каждой строки и на тысячах задач на порядки медленнее.
+        Если список не помещается в лимит параметров запроса (SQLite),
+        он делится на несколько UPDATE.
+        :param executors: словарь {id задачи: id сотрудника}
+        :returns: количество измененных задач
+        """
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        table, pk = qn(opts.db_table), qn(opts.pk.column)
+        executor = qn(opts.get_field("executor").column)
+        updated_at = qn(opts.get_field("updated_at").column)
+        batch_size = connection.ops.bulk_batch_size(["id", "executor"], executors)
+        items = iter(executors.items())
+        rows = 0
+        with transaction.atomic(using=self.db):
+            tasks = self.model.objects.filter(pk__in=executors).lock()
+            old_groups = tasks.counter_groups()
+            with connection.cursor() as cursor:
+                while batch := list(itertools.islice(items, batch_size)):
+                    values = ", ".join(["(%s, %s)"] * len(batch))
+                    cursor.execute(
+                        # Столбцы VALUES: column1 - id задачи, column2 - id сотрудника
+                        f"UPDATE {table} SET {executor} = v.column2, {updated_at} = %s "
+                        f"FROM (VALUES {values}) AS v WHERE {table}.{pk} = v.column1",
+                        [timezone.now(), *itertools.chain.from_iterable(batch)],
+                    )
+                    rows += cursor.rowcount
+            new_groups = tasks.counter_groups()
+            new_groups.subtract(old_groups)
+            TaskCounter.objects.apply_deltas(new_groups)
+        data_changed.send(sender=self.model)
+        return rows
+
+    assign_executors.alters_data = True
+
+    def bulk_create_tree(self, tasks, batch_size=None):
+        """
+        Создает задачи, родительские задачи которых могут быть среди создаваемых.
+        Задачи вставляются уровнями: сначала те, чьи родительские задачи уже в БД.
+        """
+        if not connections[self.db].features.can_return_rows_from_bulk_insert:
+            # Без получения id из bulk_create создаем задачи по порядку
+            with transaction.atomic(using=self.db):
+                for task in tasks:
+                    task.save()
+            return tasks
+
+        parent_field = self.model._meta.get_field("parent_task")
+
+        def is_ready(task):
+            # Родительская задача указана id или уже создана
+            parent = parent_field.get_cached_value(task, default=None)
+            return parent is None or parent.pk is not None
+
+        with transaction.atomic(using=self.db):
+            pending = tasks
+            while pending:
+                ready = [task for task in pending if is_ready(task)]
+                if not ready:
+                    raise ValueError("Цикл в родительских задачах создаваемых задач")
+                self.bulk_create(ready, batch_size=batch_size)
+                pending = [task for task in pending if task.pk is None]
+        return tasks
+
+    def search(self, text):
+        """
+        Полнотекстовый поиск задач по названию и описанию.
+        У найденных задач есть атрибут rank - релевантность (больше - выше).
+        """
+        words = search_words(text)
+        if not words:
+            return self.none()
+        matches, rank = search_expressions(connections[self.db].vendor, words)
+        return self.filter(matches).annotate(rank=rank)
+
+    def important(self):
+        """
+        Важные задачи:
+        - Со статусом "new"
+        - У которых есть родительская задача
+        - Родительская задача или её подзадачи в статусе "in_progress"
+        Проверки выполняются полусоединениями EXISTS без DISTINCT.
+        """
+        parent_in_progress = Task.objects.filter(
+            pk=OuterRef("parent_task_id"), status="in_progress"
+        )
+        sibling_in_progress = Task.objects.filter(
+            parent_task_id=OuterRef("parent_task_id"), status="in_progress"
+        )
+        return self.filter(status="new", parent_task__isnull=False).filter(
+            Exists(parent_in_progress) | Exists(sibling_in_progress)
+        )
+
+    def tree(self, pk, ancestors=False, max_depth=MAX_TREE_DEPTH):
+        """
+        Поддерево задачи (или цепочка ее родительских задач при ancestors=True),
+        полученное одним рекурсивным запросом.
+        У каждой задачи есть атрибут depth - расстояние до исходной задачи.
+        """
+        table = self.model._meta.db_table
+        # Для поддерева спускаемся к подзадачам, для предков - поднимаемся к родителю
+        join = (
+            "t.id = tree.parent_task_id" if ancestors else "t.parent_task_id = tree.id"
+        )
+        sql = f"""
+            WITH RECURSIVE tree (id, parent_task_id, depth) AS (
+                SELECT id, parent_task_id, 0 FROM {table} WHERE id = %s
+                UNION ALL
+                SELECT t.id, t.parent_task_id, tree.depth + 1
+                FROM {table} t JOIN tree ON {join}
+                WHERE tree.depth < %s
+            )
+            SELECT task.*, tree.depth FROM tree
+            JOIN {table} task ON task.id = tree.id
+            ORDER BY tree.depth, task.id
+        """
+        return self.raw(sql, [pk, max_depth])
+
+
 class Task(models.Model):
     """Модель задачи"""
 
@@ -66,10 +323,186 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
 
+    objects = TaskQuerySet.as_manager()
+
     def __str__(self):
         return f"Задача:{self.title}, срок сдачи: {self.deadline}"
 
+    def save(self, *args, **kwargs):
+        """Сохраняет задачу и обновляет счетчики задач сотрудников"""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic(using=kwargs.get("using")):
+            old = None
+            if self.pk is not None:
+                old = (
+                    Task.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("executor_id", "status")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            deltas = Counter({(self.executor_id, self.status): 1})
+            if old:
+                deltas[old] -= 1
+            TaskCounter.objects.apply_deltas(deltas)
+
+    def delete(self, *args, **kwargs):
+        """Удаляет задачу и обновляет счетчики задач сотрудников"""
+        with transaction.atomic(using=kwargs.get("using")):
+            old = (
+                Task.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("executor_id", "status")
+                .first()
+            )
+            result = super().delete(*args, **kwargs)
+            if old:
+                TaskCounter.objects.apply_deltas(Counter({old: -1}))
+        return result
+
     class Meta:
         verbose_name = "Задача"
         verbose_name_plural = "Задачи"
         ordering = ("-deadline",)
+        indexes = [
+            # Активные задачи сотрудника
+            models.Index(
+                fields=("executor",),
+                condition=models.Q(status="in_progress"),
+                name="task_executor_in_progress_idx",
+            ),
+            # Подзадачи в статусе (важные задачи)
+            models.Index(
+                fields=("parent_task", "status"), name="task_parent_status_idx"
+            ),
+            # Сортировка и курсорная пагинация по сроку
+            models.Index(fields=("deadline", "id"), name="task_deadline_id_idx"),
+            # Фильтр по статусу с сортировкой по сроку
+            models.Index(
+                fields=("status", "deadline"), name="task_status_deadline_idx"
+            ),
+            # Фильтр измененных с даты задач
+            models.Index(fields=("updated_at",), name="task_updated_at_idx"),
+        ]
+
+
+class TaskCounterQuerySet(models.QuerySet):
+    """QuerySet счетчиков задач сотрудников"""
+
+    def apply_deltas(self, deltas):
+        """
+        Применяет изменения счетчиков одним INSERT ... ON CONFLICT DO UPDATE:
+        отсутствующий счетчик создается атомарно, и изменения конкурирующих
+        транзакций не теряются.
+        :param deltas: словарь {(id сотрудника, статус): изменение}
+        """
+        changes = [
+            (employee_id, status, delta)
+            for (employee_id, status), delta in deltas.items()
+            if employee_id is not None and delta
+        ]
+        if not changes:
+            return
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        table = qn(opts.db_table)
+        employee, status, count = (
+            qn(opts.get_field(name).column) for name in ("employee", "status", "count")
+        )
+        batch_size = connection.ops.bulk_batch_size(
+            ["employee", "status", "count"], changes
+        )
+        items = iter(changes)
+        with connection.cursor() as cursor:
+            while batch := list(itertools.islice(items, batch_size)):
+                values = ", ".join(["(%s, %s, %s)"] * len(batch))
+                cursor.execute(
+                    f"INSERT INTO {table} ({employee}, {status}, {count}) "
+                    f"VALUES {values} ON CONFLICT ({employee}, {status}) "
+                    f"DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}",
+                    list(itertools.chain.from_iterable(batch)),
+                )
+
+    def expected(self, employee_ids=None):
+        """Фактическое количество задач по парам (сотрудник, статус)"""
+        tasks = Task.objects.all()
+        if employee_ids is not None:
+            tasks = tasks.filter(executor_id__in=employee_ids)
+        return tasks.counter_groups()
+
+    def mismatches(self):
+        """
+        Сравнивает счетчики с фактическим количеством задач.
+        :returns: словарь {(id сотрудника, статус): (счетчик, факт)}
+        """
+        expected = self.expected()
+        actual = Counter(
+            {
+                (employee_id, status): count
+                for employee_id, status, count in self.values_list(
+                    "employee_id", "status", "count"
+                )
+            }
+        )
+        return {
+            key: (actual[key], expected[key])
+            for key in expected.keys() | actual.keys()
+            if actual[key] != expected[key]
+        }
+
+    def rebuild(self, employee_ids=None):
+        """Пересчитывает счетчики (всех или указанных сотрудников) по таблице задач"""
+        employees = Employee.objects.all()
+        if employee_ids is not None:
+            employee_ids = {pk for pk in employee_ids if pk is not None}
+            employees = employees.filter(pk__in=employee_ids)
+        expected = self.expected(employee_ids)
+        counters = [
+            TaskCounter(
+                employee_id=employee_id,
+                status=status,
+                count=expected[(employee_id, status)],
+            )
+            for employee_id in employees.values_list("pk", flat=True)
+            for status, _ in Task.STATUS_CHOICES
+        ]
+        with transaction.atomic(using=self.db):
+            stale = self.all()
+            if employee_ids is not None:
+                stale = stale.filter(employee_id__in=employee_ids)
+            stale.delete()
+            self.bulk_create(counters, batch_size=1000)
+        return len(counters)
+
+
+class TaskCounter(models.Model):
+    """Счетчик задач сотрудника в определенном статусе"""
+
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="task_counters",
+        verbose_name="Сотрудник",
+    )
+    status = models.CharField(
+        max_length=20, choices=Task.STATUS_CHOICES, verbose_name="Статус"
+    )
+    count = models.IntegerField(default=0, verbose_name="Количество задач")
+
+    objects = TaskCounterQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.employee_id}: {self.status} = {self.count}"
+
+    class Meta:
+        verbose_name = "Счетчик задач"
+        verbose_name_plural = "Счетчики задач"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("employee", "status"), name="unique_employee_status_counter"
+            ),
+        ]
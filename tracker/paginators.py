@@ -1,7 +1,144 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 20
     page_query_param = "page_size"
     max_page_size = 100
+
+
+class DeadlineCursorPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация задач по ключу (deadline, id).
+    Задачи упорядочены по убыванию срока выполнения, задачи без срока идут в конце.
+    Страница выбирается по позиции последней задачи предыдущей страницы,
+    поэтому глубокие страницы не медленнее первой и не требуют COUNT(*).
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Некорректный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        # Страница собирается из нескольких диапазонов ключа,
+        # каждый из которых читается по индексу (deadline, id)
+        page = []
+        queryset = queryset.order_by()
+        for condition, ordering in self.get_ranges(position):
+            limit = self.page_size + 1 - len(page)
+            page.extend(queryset.filter(condition).order_by(*ordering)[:limit])
+            if len(page) > self.page_size:
+                break
+
+        self.has_next = len(page) > self.page_size
+        self.page = page[: self.page_size]
+        return self.page
+
+    @staticmethod
+    def get_ranges(position):
+        """Условия и сортировка диапазонов ключа после позиции курсора"""
+        without_deadline = (Q(deadline__isnull=True), ("-id",))
+        if position is None:
+            return [
+                (Q(deadline__isnull=False), ("-deadline", "-id")),
+                without_deadline,
+            ]
+        deadline, pk = position
+        if deadline is None:
+            return [(Q(deadline__isnull=True, id__lt=pk), ("-id",))]
+        return [
+            (Q(deadline=deadline, id__lt=pk), ("-id",)),
+            (Q(deadline__lt=deadline), ("-deadline", "-id")),
+            without_deadline,
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """Возвращает позицию (deadline, id) из параметра запроса"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(b64decode(encoded.encode("ascii")).decode("ascii"))
+            return self.parse_position(data)
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def parse_position(data):
+        deadline = data["deadline"] and datetime.fromisoformat(data["deadline"])
+        return deadline or None, int(data["id"])
+
+    @staticmethod
+    def get_position_data(task):
+        deadline = task.deadline.isoformat() if task.deadline else None
+        return {"deadline": deadline, "id": task.pk}
+
+    def encode_cursor(self, task):
+        data = json.dumps(self.get_position_data(task))
+        return b64encode(data.encode("ascii")).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class RankCursorPagination(DeadlineCursorPagination):
+    """
+    Курсорная (keyset) пагинация результатов поиска по ключу (rank, id):
+    сначала наиболее релевантные задачи
+    """
+
+    @staticmethod
+    def get_ranges(position):
+        if position is None:
+            return [(Q(), ("-rank", "-id"))]
+        rank, pk = position
+        return [(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk), ("-rank", "-id"))]
+
+    @staticmethod
+    def parse_position(data):
+        return float(data["rank"]), int(data["id"])
+
+    @staticmethod
+    def get_position_data(task):
+        return {"rank": task.rank, "id": task.pk}
@@ -0,0 +1,144 @@
+import json
+import logging
+import re
+import traceback
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from tracker import sql_recorder
+from tracker.sql_recorder import QueryRecorderMiddleware
+
+logger = logging.getLogger(__name__)
+
+# SQL текущего запроса, если детектор включен
+current_queries = ContextVar("current_queries", default=None)
+
+# Количество кадров стека в находке
+STACK_DEPTH = 8
+
+# Кадры детектора и записи SQL в стек находки не входят
+OWN_FILES = {__file__, sql_recorder.__file__}
+
+NORMALIZE_PATTERNS = (
+    # Строковые и числовые литералы, параметры
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    # Списки IN любой длины
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+class QueryDetectorError(AssertionError):
+    """Найдены повторяющиеся или медленные запросы (строгий режим)"""
+
+
+def normalize_sql(sql):
+    """Форма запроса: SQL без литералов и параметров"""
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def python_stack():
+    """Кадры стека кода проекта, из которого выполнен запрос"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        f"{frame.filename.removeprefix(base_dir).lstrip('/')}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and frame.filename not in OWN_FILES
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+class RequestQueries:
+    """SQL одного запроса, сгруппированный по форме"""
+
+    def __init__(self):
+        self.groups = {}
+        self.slow = []
+        self.count = 0
+
+    def add_query(self, sql, seconds):
+        self.count += 1
+        shape = normalize_sql(sql)
+        group = self.groups.get(shape)
+        if group is None:
+            group = self.groups[shape] = {
+                "count": 0,
+                "seconds": 0,
+                "stack": python_stack(),
+            }
+        group["count"] += 1
+        group["seconds"] += seconds
+        if seconds * 1000 >= settings.QUERY_DETECTOR_SLOW_MS:
+            self.slow.append(
+                {
+                    "kind": "slow",
+                    "sql": sql,
+                    "duration_ms": round(seconds * 1000, 2),
+                    "stack": python_stack(),
+                }
+            )
+
+    def findings(self):
+        """Повторяющиеся формы запросов и медленные запросы"""
+        repeated = [
+            {
+                "kind": "repeated",
+                "sql": shape,
+                "count": group["count"],
+                "duration_ms": round(group["seconds"] * 1000, 2),
+                "stack": group["stack"],
+            }
+            for shape, group in self.groups.items()
+            if group["count"] >= settings.QUERY_DETECTOR_REPEAT_THRESHOLD
+        ]
+        return repeated + self.slow
+
+
+class QueryDetectorMiddleware(QueryRecorderMiddleware):
+    """
+    Детектор N+1 и медленных запросов (включается QUERY_DETECTOR).
+    SQL каждого запроса группируется по форме (без литералов и параметров);
+    находками считаются формы, выполненные не менее
+    QUERY_DETECTOR_REPEAT_THRESHOLD раз, и запросы дольше QUERY_DETECTOR_SLOW_MS.
+    Находки со стеком кода проекта дописываются строкой JSON в QUERY_DETECTOR_REPORT,
+    а в строгом режиме (QUERY_DETECTOR_STRICT) вызывают QueryDetectorError.
+    """
+
+    current = current_queries
+
+    def __init__(self, get_response):
+        if not settings.QUERY_DETECTOR:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def start(self, request):
+        return RequestQueries()
+
+    def finish(self, request, response, queries):
+        self.report(request, response, queries)
+        return response
+
+    def report(self, request, response, queries):
+        findings = queries.findings()
+        if not findings:
+            return
+        entry = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "queries": queries.count,
+            "findings": findings,
+        }
+        if settings.QUERY_DETECTOR_STRICT:
+            raise QueryDetectorError(json.dumps(entry, ensure_ascii=False, indent=2))
+        logger.warning("%s %s: находок %d", request.method, request.path, len(findings))
+        with open(settings.QUERY_DETECTOR_REPORT, "a", encoding="utf-8") as report:
+            report.write(json.dumps(entry, ensure_ascii=False) + "\n")
@@ -0,0 +1,149 @@
+import re
+
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+# Конфигурация полнотекстового поиска PostgreSQL (стемминг русского языка)
+SEARCH_CONFIG = "russian"
+
+TASK_TABLE = "tracker_task"
+FTS_TABLE = "tracker_task_fts"
+
+# PostgreSQL: вычисляемый столбец tsvector поддерживается самой БД при любых
+# INSERT/UPDATE (save, bulk_create, update, COPY), поиск - по GIN-индексу.
+# Название весит больше описания (веса A и B)
+POSTGRESQL_SQL = [
+    f"""
+    ALTER TABLE {TASK_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS task_search_vector_idx
+    ON {TASK_TABLE} USING gin (search_vector)
+    """,
+]
+POSTGRESQL_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS task_search_vector_idx",
+    f"ALTER TABLE {TASK_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: индекс FTS5 над таблицей задач, поддерживаемый триггерами
+SQLITE_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE} (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+SQLITE_REVERSE_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def ensure_search_index(connection):
+    """
+    Создает структуры полнотекстового поиска задач, если их нет.
+    На SQLite пересоздание таблицы задач миграциями удаляет триггеры,
+    поэтому функция вызывается и после каждой миграции (post_migrate)
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            for sql in POSTGRESQL_SQL:
+                cursor.execute(sql)
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                [f"{FTS_TABLE}_ai"],
+            )
+            if cursor.fetchone():
+                return
+            cursor.execute(
+                f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                    title, description, content='{TASK_TABLE}', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                """
+            )
+            for sql in SQLITE_TRIGGERS_SQL:
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(connection):
+    sql_list = {
+        "postgresql": POSTGRESQL_REVERSE_SQL,
+        "sqlite": SQLITE_REVERSE_SQL,
+    }.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in sql_list:
+            cursor.execute(sql)
+
+
+def search_words(text):
+    """Слова поискового запроса (без операторов языков запросов)"""
+    return re.findall(r"\w+", text or "")
+
+
+def search_expressions(vendor, words):
+    """
+    Условие совпадения и ранг (больше - релевантнее) для поиска задач по словам
+    :returns: пара выражений RawSQL
+    """
+    if vendor == "postgresql":
+        query = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+        params = [" ".join(words)]
+        return (
+            RawSQL(
+                f'"{TASK_TABLE}"."search_vector" @@ {query}',
+                params,
+                output_field=BooleanField(),
+            ),
+            # ts_rank возвращает real: приводим к float8, иначе ранг из курсора
+            # (double precision) не равен рангу строки и записи на границе
+            # страниц повторяются или пропускаются
+            RawSQL(
+                f'ts_rank("{TASK_TABLE}"."search_vector", {query})::float8',
+                params,
+                output_field=FloatField(),
+            ),
+        )
+    if vendor == "sqlite":
+        # Каждое слово в кавычках: запрос не интерпретируется как синтаксис FTS5
+        params = [" ".join(f'"{word}"' for word in words)]
+        return (
+            RawSQL(
+                f'"{TASK_TABLE}"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+                f"WHERE {FTS_TABLE} MATCH %s)",
+                params,
+                output_field=BooleanField(),
+            ),
+            RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} "
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{TASK_TABLE}"."id")',
+                params,
+                output_field=FloatField(),
+            ),
+        )
+    raise NotImplementedError(f"Полнотекстовый поиск не поддерживается для {vendor}")
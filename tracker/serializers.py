@@ -1,7 +1,7 @@
-from django.db.models import Count, Q
 from rest_framework import serializers
 
 from tracker.models import Employee, Task
+from tracker.services import EmployeesWorkload
 from tracker.validators import (validate_deadline_not_in_past,
                                 validate_deadline_with_parent,
                                 validate_status_on_creation)
@@ -32,15 +32,194 @@ class TaskSerializer(serializers.ModelSerializer):
         return data
 
 
+class TaskBulkCreateListSerializer(serializers.ListSerializer):
+    """
+    Сериализатор пакета задач: связанные задачи и сотрудники загружаются
+    одним запросом на модель, проверки выполняются в памяти,
+    задачи создаются через bulk_create в одной транзакции
+    """
+
+    max_batch_size = 1000
+
+    def to_internal_value(self, data):
+        """
+        Проверяет пакет целиком. Ошибки возвращаются списком по задачам пакета
+        """
+        if isinstance(data, list) and len(data) > self.max_batch_size:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        f"В пакете может быть не больше {self.max_batch_size} задач."
+                    ]
+                }
+            )
+        attrs = super().to_internal_value(data)
+
+        parents = Task.objects.in_bulk(
+            {
+                item["parent_task"]
+                for item in attrs
+                if item.get("parent_task") is not None
+            }
+        )
+        executors = Employee.objects.in_bulk(
+            {item["executor"] for item in attrs if item.get("executor") is not None}
+        )
+
+        errors = []
+        for index, item in enumerate(attrs):
+            item_errors = {}
+            parent_index = item.get("parent_index")
+            if item.get("parent_task") is not None:
+                item["parent_task"] = parents.get(item["parent_task"])
+                if item["parent_task"] is None:
+                    item_errors["parent_task"] = ["Задача не найдена."]
+                elif parent_index is not None:
+                    item_errors["parent_index"] = [
+                        "Укажите либо parent_task, либо parent_index."
+                    ]
+            elif parent_index is not None and parent_index >= index:
+                item_errors["parent_index"] = [
+                    "Родительская задача должна быть раньше в пакете."
+                ]
+
+            if item.get("executor") is not None:
+                item["executor"] = executors.get(item["executor"])
+                if item["executor"] is None:
+                    item_errors["executor"] = ["Сотрудник не найден."]
+
+            if not item_errors:
+                values = item
+                if parent_index is not None:
+                    # Родительская задача из пакета еще не создана
+                    parent = Task(deadline=attrs[parent_index].get("deadline"))
+                    values = {**item, "parent_task": parent}
+                try:
+                    validate_deadline_not_in_past(values)
+                    validate_deadline_with_parent(values)
+                    validate_status_on_creation(self.child, values)
+                except serializers.ValidationError as exc:
+                    item_errors["non_field_errors"] = exc.detail
+            errors.append(item_errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        tasks = []
+        for item in validated_data:
+            parent_index = item.pop("parent_index", None)
+            task = Task(**item)
+            if parent_index is not None:
+                task.parent_task = tasks[parent_index]
+            tasks.append(task)
+        return Task.objects.bulk_create_tree(tasks)
+
+
+class TaskBulkCreateSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор задачи в пакетном создании.
+    Родительская задача указывается id (parent_task)
+    или номером задачи, расположенной раньше в пакете (parent_index).
+    """
+
+    parent_task = serializers.IntegerField(required=False, allow_null=True)
+    parent_index = serializers.IntegerField(
+        required=False, min_value=0, write_only=True
+    )
+    executor = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = "__all__"
+        list_serializer_class = TaskBulkCreateListSerializer
+
+    def to_representation(self, instance):
+        return TaskSerializer(instance, context=self.context).data
+
+
+class TaskBulkFilterSerializer(serializers.Serializer):
+    """Условия отбора задач для массового изменения"""
+
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    executor = serializers.IntegerField(required=False, allow_null=True)
+    parent_task = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Укажите хотя бы одно условие.")
+        return attrs
+
+
+class TaskBulkUpdateSerializer(serializers.Serializer):
+    """
+    Массовое изменение статуса и/или исполнителя задач,
+    отобранных по списку id или по условиям
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = TaskBulkFilterSerializer(required=False)
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    executor = serializers.PrimaryKeyRelatedField(
+        queryset=Employee.objects.all(), required=False, allow_null=True
+    )
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Укажите либо ids, либо filter.")
+        if "status" not in attrs and "executor" not in attrs:
+            raise serializers.ValidationError("Укажите status и/или executor.")
+        return attrs
+
+    def get_tasks(self):
+        """Задачи, которые нужно изменить"""
+        if "ids" in self.validated_data:
+            return Task.objects.filter(pk__in=self.validated_data["ids"])
+        conditions = self.validated_data["filter"]
+        return Task.objects.filter(
+            **{
+                f"{field}_id" if field in ("executor", "parent_task") else field: value
+                for field, value in conditions.items()
+            }
+        )
+
+    def get_changes(self):
+        """Новые значения полей задач"""
+        return {
+            field: self.validated_data[field]
+            for field in ("status", "executor")
+            if field in self.validated_data
+        }
+
+
+class TaskTreeSerializer(TaskSerializer):
+    """Сериализатор задачи в дереве задач с глубиной относительно исходной задачи"""
+
+    depth = serializers.IntegerField(read_only=True)
+
+
+class TaskSearchSerializer(TaskSerializer):
+    """Сериализатор найденной задачи с релевантностью"""
+
+    rank = serializers.FloatField(read_only=True)
+
+
 class EmployeeTasksSerializer(serializers.ModelSerializer):
     """Сериализатор сотрудника с его задачами и количеством выполняемых задач"""
 
     active_task_count = serializers.SerializerMethodField()
-    tasks = TaskSerializer(many=True)
+    # Задачи, отобранные во View через Prefetch(to_attr="selected_tasks")
+    tasks = TaskSerializer(many=True, source="selected_tasks")
 
     @staticmethod
     def get_active_task_count(obj):
-        return obj.tasks.filter(status="in_progress").count()
+        active_task_count = getattr(obj, "active_task_count", None)
+        if active_task_count is None:
+            return obj.tasks.filter(status="in_progress").count()
+        return active_task_count
 
     class Meta:
         model = Employee
@@ -56,33 +235,13 @@ class ImportantTaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = ("title", "deadline", "executors")
 
-    @staticmethod
-    def get_executors(task):
+    def get_executors(self, task):
         """
-        Метод для поиска сотрудников, которые могут взять задачу:
-        - Сотрудники с минимальным количеством задач в статусе "in_progress"
-        - Сотрудник, выполняющий родительскую задачу,
-        если у него максимум на 2 задачи больше, чем у наименее загруженного
+        Метод для поиска сотрудников, которые могут взять задачу.
+        Снимок загруженности сотрудников берется из контекста,
+        чтобы не пересчитывать его для каждой задачи.
         """
-        # Подсчет задач в статусе "in_progress" у сотрудников
-        employees_with_task_counts = Employee.objects.annotate(
-            active_task_count=Count("tasks", filter=Q(tasks__status="in_progress"))
-        ).order_by("active_task_count")
-
-        if not employees_with_task_counts.exists():
-            return ["Нет доступных сотрудников"]
-
-        # Минимальное количество задач в статусе "in_progress"
-        min_task_count = employees_with_task_counts.first().active_task_count
-
-        # Формирование списка подходящих сотрудников для выполнения задачи:
-        potential_executors = []
-        for employee in employees_with_task_counts:
-            if employee.active_task_count == min_task_count or (
-                task.parent_task
-                and task.parent_task.executor == employee
-                and employee.active_task_count <= min_task_count + 2
-            ):
-                potential_executors.append(employee.full_name)
-
-        return potential_executors
+        workload = self.context.get("workload")
+        if workload is None:
+            workload = self.context["workload"] = EmployeesWorkload.load()
+        return workload.executors_for(task)
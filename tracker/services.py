@@ -0,0 +1,257 @@
+import csv
+import heapq
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from tracker.models import ACTIVE_STATUSES, Employee, Task
+
+NO_EXECUTORS = "Нет доступных сотрудников"
+
+
+class EmployeesWorkload:
+    """
+    Снимок загруженности сотрудников (количество задач в статусе "in_progress").
+    Вычисляется одним запросом и используется для всех задач в рамках запроса.
+    """
+
+    # Допустимый перевес задач у исполнителя родительской задачи
+    PARENT_EXECUTOR_EXTRA = 2
+
+    def __init__(self, employees):
+        self.employees = list(employees)
+        self.counts = {
+            employee.id: employee.active_task_count for employee in self.employees
+        }
+        self.names = {employee.id: employee.full_name for employee in self.employees}
+        self.min_task_count = (
+            self.employees[0].active_task_count if self.employees else None
+        )
+        self.least_loaded = [
+            employee.full_name
+            for employee in self.employees
+            if employee.active_task_count == self.min_task_count
+        ]
+
+    @staticmethod
+    def get_queryset():
+        return (
+            Employee.objects.with_task_count()
+            .only("id", "full_name")
+            .order_by("active_task_count", "full_name")
+        )
+
+    @classmethod
+    def load(cls):
+        """Загружает сотрудников с количеством активных задач одним запросом"""
+        return cls(cls.get_queryset())
+
+    @classmethod
+    async def aload(cls):
+        """Асинхронная версия load()"""
+        return cls([employee async for employee in cls.get_queryset()])
+
+    def executors_for(self, task):
+        """
+        Возвращает сотрудников, которые могут взять задачу:
+        - Сотрудники с минимальным количеством задач в статусе "in_progress"
+        - Сотрудник, выполняющий родительскую задачу,
+        если у него максимум на 2 задачи больше, чем у наименее загруженного
+        """
+        if not self.employees:
+            return [NO_EXECUTORS]
+
+        potential_executors = list(self.least_loaded)
+        parent_task = task.parent_task
+        executor_id = parent_task.executor_id if parent_task else None
+        count = self.counts.get(executor_id)
+        max_task_count = self.min_task_count + self.PARENT_EXECUTOR_EXTRA
+        if count is not None and self.min_task_count < count <= max_task_count:
+            potential_executors.append(self.names[executor_id])
+        return potential_executors
+
+    def plan(self, tasks):
+        """
+        Сбалансированное распределение задач за один проход.
+        Задача достается исполнителю родительской задачи, если у него максимум
+        на 2 задачи больше, чем у наименее загруженного сотрудника, иначе -
+        наименее загруженному. Загруженность учитывает уже распределенные задачи
+        и хранится в min-куче (устаревшие записи кучи пропускаются).
+        :param tasks: пары (id задачи, id исполнителя родительской задачи)
+        :returns: словарь {id задачи: id сотрудника}
+        """
+        if not self.employees:
+            return {}
+        loads = dict(self.counts)
+        heap = [(loads[pk], self.names[pk], pk) for pk in loads]
+        heapq.heapify(heap)
+
+        plan = {}
+        for task_id, parent_executor_id in tasks:
+            while heap[0][0] != loads[heap[0][2]]:
+                heapq.heappop(heap)
+            min_load, _, executor_id = heap[0]
+            parent_load = loads.get(parent_executor_id)
+            if (
+                parent_load is not None
+                and parent_load <= min_load + self.PARENT_EXECUTOR_EXTRA
+            ):
+                executor_id = parent_executor_id
+            loads[executor_id] += 1
+            entry = (loads[executor_id], self.names[executor_id], executor_id)
+            if executor_id == heap[0][2]:
+                heapq.heapreplace(heap, entry)
+            else:
+                heapq.heappush(heap, entry)
+            plan[task_id] = executor_id
+        return plan
+
+
+def assignment_plan():
+    """
+    План распределения всех важных задач (в порядке срока выполнения)
+    между сотрудниками
+    :returns: список назначений задача - сотрудник
+    """
+    tasks = list(
+        Task.objects.important()
+        .order_by(F("deadline").asc(nulls_last=True), "id")
+        .values_list("id", "title", "parent_task__executor_id")
+    )
+    workload = EmployeesWorkload.load()
+    plan = workload.plan(
+        (pk, parent_executor_id) for pk, _, parent_executor_id in tasks
+    )
+    return [
+        {
+            "task": pk,
+            "title": title,
+            "executor": plan[pk],
+            "full_name": workload.names[plan[pk]],
+        }
+        for pk, title, _ in tasks
+        if pk in plan
+    ]
+
+
+def apply_assignment_plan(assignments):
+    """
+    Назначает исполнителей задач по плану одним UPDATE
+    :returns: количество измененных задач
+    """
+    return Task.objects.assign_executors(
+        {assignment["task"]: assignment["executor"] for assignment in assignments}
+    )
+
+
+# Поля задачи в выгрузке, названия совпадают с TaskSerializer
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "parent_task",
+    "executor",
+    "deadline",
+    "status",
+    "created_at",
+    "updated_at",
+)
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _LineBuffer:
+    """Буфер для csv.writer, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def stream_tasks(queryset, export_format="ndjson", chunk_size=2000):
+    """
+    Генератор строк выгрузки задач в формате NDJSON или CSV.
+    Задачи читаются серверным курсором порциями по chunk_size,
+    поэтому потребление памяти не зависит от размера таблицы.
+    """
+    rows = queryset.order_by("pk").values(*EXPORT_FIELDS).iterator(chunk_size)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    if export_format == "csv":
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow(
+                encoder.default(value) if isinstance(value, datetime) else value
+                for value in row.values()
+            )
+    else:
+        for row in rows:
+            yield encoder.encode(row) + "\n"
+
+
+def deadline_bounds(now):
+    """Начало завтрашнего дня и следующей недели в часовом поясе проекта"""
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    next_week = today + timedelta(days=7 - today.weekday())
+    return tomorrow, next_week
+
+
+def task_statistics(now=None):
+    """
+    Статистика задач по исполнителям и в целом, вычисленная одним запросом
+    с группировкой по исполнителю и агрегатами с FILTER:
+    - statuses: количество задач в каждом статусе
+    - overdue: незавершенные задачи с прошедшим сроком
+    - deadlines: незавершенные задачи со сроком сегодня, на этой неделе, позже и без срока
+    """
+    now = now or timezone.now()
+    tomorrow, next_week = deadline_bounds(now)
+    active = Q(status__in=ACTIVE_STATUSES)
+    aggregates = {
+        status: Count("id", filter=Q(status=status))
+        for status, _ in Task.STATUS_CHOICES
+    }
+    aggregates.update(
+        overdue=Count("id", filter=active & Q(deadline__lt=now)),
+        today=Count("id", filter=active & Q(deadline__gte=now, deadline__lt=tomorrow)),
+        this_week=Count(
+            "id", filter=active & Q(deadline__gte=tomorrow, deadline__lt=next_week)
+        ),
+        later=Count("id", filter=active & Q(deadline__gte=next_week)),
+        no_deadline=Count("id", filter=active & Q(deadline__isnull=True)),
+    )
+    rows = (
+        Task.objects.order_by()
+        .values("executor_id", "executor__full_name")
+        .annotate(**aggregates)
+        .order_by("executor__full_name", "executor_id")
+    )
+
+    total = dict.fromkeys(aggregates, 0)
+    employees = []
+    for row in rows:
+        for name in aggregates:
+            total[name] += row[name]
+        employees.append(
+            {
+                "employee": row["executor_id"],
+                "full_name": row["executor__full_name"],
+                **statistics_entry(row),
+            }
+        )
+    return {"total": statistics_entry(total), "employees": employees}
+
+
+def statistics_entry(counts):
+    return {
+        "statuses": {status: counts[status] for status, _ in Task.STATUS_CHOICES},
+        "overdue": counts["overdue"],
+        "deadlines": {
+            name: counts[name]
+            for name in ("today", "this_week", "later", "no_deadline")
+        },
+    }
@@ -0,0 +1,32 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import Signal, receiver
+
+from tracker.cache import response_cache
+from tracker.search import ensure_search_index
+
+# Отправляется после массовых операций, которые не вызывают post_save/post_delete
+# (QuerySet.update, bulk_create, bulk_update, загрузка через COPY). sender - модель
+data_changed = Signal()
+
+
+@receiver(post_save, sender="tracker.Task")
+@receiver(post_delete, sender="tracker.Task")
+@receiver(post_save, sender="tracker.Employee")
+@receiver(post_delete, sender="tracker.Employee")
+@receiver(data_changed)
+def invalidate_response_cache(sender, **kwargs):
+    """Сбрасывает кэш ответов списков при изменении задач и сотрудников"""
+    response_cache.invalidate()
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """Восстанавливает триггеры поиска, удаленные пересозданием таблицы задач (SQLite)"""
+    if sender.name != "tracker":
+        return
+    connection = connections[using]
+    applied = MigrationRecorder(connection).applied_migrations()
+    if ("tracker", "0006_task_search") in applied:
+        ensure_search_index(connection)
@@ -0,0 +1,97 @@
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+# Получатели SQL текущего запроса (замеры, детектор и т.п.)
+current_recorders = ContextVar("current_recorders", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обертка выполнения SQL (connection.execute_wrapper): передает запрос
+    и время его выполнения всем получателям текущего запроса
+    """
+    recorders = current_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - start
+        for recorder in recorders:
+            recorder.add_query(sql, seconds)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class QueryRecorderMiddleware:
+    """
+    Базовый middleware, собирающий SQL запроса в получатель (объект с методом
+    add_query(sql, seconds)). Наследники создают получатель в start()
+    (None - запрос не записывается) и обрабатывают результат в finish().
+    Получатель запроса доступен через ContextVar current.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    current = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Новые соединения (в том числе в потоках асинхронного ORM)
+        connection_created.connect(install_query_recorder)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = self.start(request)
+        if recorder is None:
+            return self.get_response(request)
+
+        install_query_recorder(connection)
+        tokens = self.activate(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.deactivate(tokens)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = self.start(request)
+        if recorder is None:
+            return await self.get_response(request)
+
+        tokens = self.activate(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.deactivate(tokens)
+        return self.finish(request, response, recorder)
+
+    def activate(self, recorder):
+        return (
+            self.current.set(recorder),
+            current_recorders.set((*current_recorders.get(), recorder)),
+        )
+
+    def deactivate(self, tokens):
+        token, recorders_token = tokens
+        current_recorders.reset(recorders_token)
+        self.current.reset(token)
+
+    def start(self, request):
+        """:returns: получатель SQL запроса или None"""
+        raise NotImplementedError
+
+    def finish(self, request, response, recorder):
+        return response
@@ -1,15 +1,52 @@
+import csv
+import itertools
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F, Prefetch
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
-from rest_framework.test import APITestCase
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
-from tracker.models import Employee, Task
+from tracker.cache import response_cache
+from tracker.management.commands.benchmark_db_connections import (
+    MODES, make_connection, request_cycle)
+from tracker.management.commands.benchmark_important_tasks import \
+    legacy_important_tasks
+from tracker.models import Employee, Task, TaskCounter, TaskQuerySet
+from tracker.paginators import DeadlineCursorPagination
+from tracker.query_detector import QueryDetectorError, normalize_sql
+from tracker.services import (EmployeesWorkload, deadline_bounds,
+                              task_statistics)
 from tracker.validators import (validate_deadline_not_in_past,
                                 validate_deadline_with_parent,
                                 validate_status_on_creation)
+from tracker.views import (EmployeeTasksAPIView, ImportantTasksAPIView,
+                           TaskCursorListAPIView, TaskListAPIView,
+                           TaskRetrieveAPIView)
 from users.models import User
+from users.roles import is_moderator_user
 
 
 class FakeSerializer:
@@ -210,7 +247,382 @@ class TaskAPIViewTests(BaseAPITestCase):
         url = reverse("tracker:employee-tasks-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data.get("results")), 2)
+
+
+class TaskBulkCreateTests(BaseAPITestCase):
+    """
+    Тесты пакетного создания задач.
+    """
+
+    url = reverse("tracker:task-bulk-create")
+
+    def test_task_bulk_create(self):
+        """Тест: пакет создается с родительскими задачами из БД и из пакета."""
+        deadline = timezone.now() + timezone.timedelta(days=2)
+        data = [
+            {"title": "Epic", "status": "new", "deadline": deadline.isoformat()},
+            {"title": "Story", "status": "new", "parent_index": 0},
+            {"title": "Subtask", "status": "in_progress", "parent_index": 1},
+            {
+                "title": "Existing parent",
+                "status": "new",
+                "parent_task": self.parent_task.id,
+                "executor": self.employee.id,
+            },
+        ]
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 4)
+
+        epic = Task.objects.get(title="Epic")
+        story = Task.objects.get(title="Story")
+        self.assertEqual(story.parent_task, epic)
+        self.assertEqual(Task.objects.get(title="Subtask").parent_task, story)
+        self.assertEqual(
+            Task.objects.get(title="Existing parent").parent_task, self.parent_task
+        )
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_task_bulk_create_constant_queries(self):
+        """Тест: количество запросов не зависит от размера пакета."""
+        self.client.force_authenticate(user=self.moderator)
+        # Роль модератора сохраняется в кэше при первой проверке
+        is_moderator_user(self.moderator)
+        for size in (5, 50):
+            data = [
+                {
+                    "title": f"Task {i}",
+                    "status": "new",
+                    "parent_task": self.task2.id,
+                    "executor": self.employee.id,
+                }
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            if size == 5:
+                queries_count = len(queries)
+        self.assertEqual(len(queries), queries_count)
+
+    def test_task_bulk_create_errors_per_item(self):
+        """Тест: ошибки возвращаются для каждой задачи, ничего не создается."""
+        data = [
+            {"title": "Valid", "status": "new"},
+            {"title": "Unknown parent", "status": "new", "parent_task": 0},
+            {"title": "Forward ref", "status": "new", "parent_index": 3},
+            {"title": "Wrong status", "status": "completed"},
+        ]
+        self.client.force_authenticate(user=self.moderator)
+        tasks_count = Task.objects.count()
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("parent_task", response.data[1])
+        self.assertIn("parent_index", response.data[2])
+        self.assertIn("non_field_errors", response.data[3])
+        self.assertEqual(Task.objects.count(), tasks_count)
+
+    def test_task_bulk_create_parent_deadline_in_batch(self):
+        """Тест: дедлайн проверяется по родительской задаче из пакета."""
+        deadline = timezone.now() + timezone.timedelta(days=2)
+        data = [
+            {"title": "Epic", "status": "new", "deadline": deadline.isoformat()},
+            {
+                "title": "Late story",
+                "status": "new",
+                "parent_index": 0,
+                "deadline": (deadline + timezone.timedelta(days=1)).isoformat(),
+            },
+        ]
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data[1])
+
+    def test_task_bulk_create_permissions(self):
+        """Тест: пакетное создание доступно только модератору."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, [{"title": "Task"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TaskBulkUpdateTests(BaseAPITestCase):
+    """
+    Тесты массового изменения задач.
+    """
+
+    url = reverse("tracker:task-bulk-update")
+
+    def test_task_bulk_update_status_by_ids(self):
+        """Тест: статус меняется по списку id, updated_at обновляется."""
+        updated_at = self.task.updated_at
+        data = {"ids": [self.task.id, self.parent_task.id], "status": "completed"}
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["updated"], sorted([self.task.id, self.parent_task.id])
+        )
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, "completed")
+        self.assertGreater(self.task.updated_at, updated_at)
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_task_bulk_update_executor_by_filter(self):
+        """Тест: задачи сотрудника передаются другому по условию."""
+        data = {"filter": {"executor": self.employee.id}, "executor": self.employee2.id}
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(len(response.data["updated"]), 2)
+        self.assertFalse(Task.objects.filter(executor=self.employee).exists())
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_task_bulk_update_constant_queries(self):
+        """Тест: количество запросов не зависит от количества задач."""
+        self.client.force_authenticate(user=self.moderator)
+        is_moderator_user(self.moderator)
+        # Счетчики для всех статусов, чтобы не создавать их во время замера
+        TaskCounter.objects.rebuild()
+        queries_count = []
+        for size in (3, 30):
+            Task.objects.bulk_create(
+                Task(title=f"Task {i}", executor=self.employee, status="on_review")
+                for i in range(size)
+            )
+            data = {"filter": {"status": "on_review"}, "status": "completed"}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, data, format="json")
+            self.assertEqual(len(response.data["updated"]), size)
+            queries_count.append(len(queries))
+        self.assertEqual(queries_count[0], queries_count[1])
+
+    def test_task_bulk_update_validation(self):
+        """Тест: некорректные запросы и права доступа."""
+        self.client.force_authenticate(user=self.moderator)
+        for data in (
+            {"ids": [self.task.id]},
+            {"ids": [self.task.id], "status": "unknown"},
+            {"ids": [self.task.id], "filter": {"status": "new"}, "status": "new"},
+            {"filter": {}, "status": "new"},
+        ):
+            response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.user)
+        data = {"ids": [self.task.id], "status": "completed"}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TaskFilterTests(BaseAPITestCase):
+    """
+    Тесты фильтров списка задач.
+    """
+
+    url = reverse("tracker:task-list")
+
+    def get_titles(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {task["title"] for task in response.data["results"]}
+
+    def test_task_list_filters(self):
+        """Тест: фильтры по статусу, исполнителю, родителю и сроку."""
+        self.assertEqual(
+            self.get_titles({"status": ["new", "in_progress"]}),
+            {"Task 1", "Task 2", "Parent Task"},
+        )
+        self.assertEqual(self.get_titles({"status": "in_progress"}), {"Task 2"})
+        self.assertEqual(
+            self.get_titles({"executor": self.employee.pk, "status": "new"}),
+            {"Task 1", "Parent Task"},
+        )
+        self.assertEqual(self.get_titles({"parent_task": self.task2.pk}), {"Task 1"})
+        deadline = self.parent_task.deadline
+        self.assertEqual(
+            self.get_titles(
+                {
+                    "deadline_after": (
+                        deadline - timezone.timedelta(hours=1)
+                    ).isoformat(),
+                    "deadline_before": deadline.isoformat(),
+                }
+            ),
+            {"Parent Task"},
+        )
+
+    def test_task_list_overdue_and_updated_since(self):
+        """Тест: просроченные задачи и задачи, измененные с даты."""
+        past = timezone.now() - timezone.timedelta(days=1)
+        Task.objects.filter(pk=self.task.pk).update(deadline=past)
+        Task.objects.create(title="Done", status="completed", deadline=past)
+        self.assertEqual(self.get_titles({"overdue": "true"}), {"Task 1"})
+        self.assertNotIn("Task 1", self.get_titles({"overdue": "false"}))
+
+        since = timezone.now()
+        Task.objects.filter(pk=self.task2.pk).update(updated_at=since)
+        self.assertEqual(
+            self.get_titles({"updated_since": since.isoformat()}), {"Task 2"}
+        )
+
+    def test_task_list_invalid_filters(self):
+        """Тест: некорректные значения фильтров."""
+        for params in ({"status": "unknown"}, {"updated_since": "yesterday"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskExportTests(BaseAPITestCase):
+    """
+    Тесты потоковой выгрузки задач.
+    """
+
+    url = reverse("tracker:task-export")
+
+    def test_task_export_ndjson(self):
+        """Тест: выгрузка в NDJSON, по строке на задачу."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(
+            [row["id"] for row in rows],
+            sorted(Task.objects.values_list("pk", flat=True)),
+        )
+        self.assertEqual(rows[1]["parent_task"], self.task2.id)
+        self.assertNotIn("ETag", response)
+
+    def test_task_export_csv(self):
+        """Тест: выгрузка в CSV с заголовком."""
+        response = self.client.get(self.url, {"export_format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["title"], "Task 2")
+
+    def test_task_export_invalid_format(self):
+        """Тест: неизвестный формат выгрузки."""
+        response = self.client.get(self.url, {"export_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_tasks_command(self):
+        """Тест: команда выгрузки задач."""
+        stdout = StringIO()
+        call_command("export_tasks", "--chunk-size", 1, stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 3)
+        with self.assertRaises(CommandError):
+            call_command("export_tasks", "--filter", "status", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "executor"):
+            call_command("export_tasks", "--filter", "executor=x", stdout=StringIO())
+
+
+class TaskImportTests(BaseAPITestCase):
+    """
+    Тесты загрузки сотрудников и задач командой import_tasks.
+    """
+
+    def write_file(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            file.write(content)
+        return path
+
+    def write_ndjson(self, name, rows):
+        return self.write_file(name, "".join(json.dumps(row) + "\n" for row in rows))
+
+    def test_import_tasks_references(self):
+        """Тест: ссылки на задачи и сотрудников файла в любом порядке и на БД."""
+        deadline = (timezone.now() + timezone.timedelta(days=3)).isoformat()
+        employees = self.write_file(
+            "employees.csv",
+            "id,full_name,position,user\ne1,Ivan,QA,\ne2,Anna,,%s\n" % self.user.pk,
+        )
+        tasks = self.write_ndjson(
+            "tasks.ndjson",
+            [
+                {"id": "c", "title": "Child", "parent_task": "p", "executor": "e1"},
+                {
+                    "id": "p",
+                    "title": "Parent",
+                    "deadline": deadline,
+                    "status": "in_progress",
+                    "executor": "e2",
+                },
+                {
+                    "title": "Sub",
+                    "parent_task": self.parent_task.pk,
+                    "executor": self.employee.pk,
+                },
+            ],
+        )
+        stdout = StringIO()
+        call_command(
+            "import_tasks",
+            "--employees",
+            employees,
+            "--tasks",
+            tasks,
+            "--batch-size",
+            1,
+            stdout=stdout,
+        )
+        self.assertIn("сотрудников: 2, задач: 3", stdout.getvalue())
+
+        ivan = Employee.objects.get(full_name="Ivan")
+        self.assertEqual(Employee.objects.get(full_name="Anna").user, self.user)
+        child = Task.objects.get(title="Child")
+        self.assertEqual(child.executor, ivan)
+        self.assertEqual(child.parent_task.title, "Parent")
+        self.assertEqual(Task.objects.get(title="Sub").parent_task, self.parent_task)
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_import_tasks_errors(self):
+        """Тест: при ошибках в данных ничего не загружается."""
+        tasks = self.write_ndjson(
+            "tasks.ndjson",
+            [
+                {"id": 1, "title": "Valid"},
+                {"id": 2, "title": "", "status": "unknown"},
+                {"id": 3, "title": "Cycle A", "parent_task": 4},
+                {"id": 4, "title": "Cycle B", "parent_task": 3},
+                {"title": "Missing", "parent_task": 10**6, "executor": 10**6},
+                {"title": "Done", "status": "completed"},
+            ],
+        )
+        count = Task.objects.count()
+        stderr = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("import_tasks", "--tasks", tasks, stderr=stderr)
+        errors = stderr.getvalue()
+        self.assertIn("Строка 2: не указано название задачи", errors)
+        self.assertIn("неизвестный статус", errors)
+        self.assertIn("цикл в родительских задачах", errors)
+        self.assertIn(f"задача {10**6} не найдена", errors)
+        self.assertIn(f"сотрудник {10**6} не найден", errors)
+        self.assertEqual(Task.objects.count(), count)
+
+    def test_import_tasks_validators(self):
+        """Тест: правила валидаторов задач применяются к загружаемым строкам."""
+        deadline = timezone.now() + timezone.timedelta(days=10)
+        tasks = self.write_file(
+            "tasks.csv",
+            "title,status,parent_task,deadline\n"
+            f"Late,new,{self.parent_task.pk},{deadline.isoformat()}\n"
+            "Done,completed,,\n",
+        )
+        stderr = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("import_tasks", "--tasks", tasks, stderr=stderr)
+        self.assertIn("Строка 2: Дедлайн задачи должен быть", stderr.getvalue())
+        self.assertIn("Строка 3: Задача при создании", stderr.getvalue())
 
 
 class TaskValidatorsTests(BaseAPITestCase):
@@ -281,3 +693,1110 @@ class TaskValidatorsTests(BaseAPITestCase):
             validate_status_on_creation(serializer_instance, data)
         except ValidationError:
             self.fail("ValidationError was raised for a valid status.")
+
+
+class ResponseCacheTests(BaseAPITestCase):
+    """
+    Тесты кэша ответов публичных списков.
+    """
+
+    url = reverse("tracker:task-list")
+
+    def setUp(self):
+        super().setUp()
+        response_cache.reset_stats()
+
+    def test_response_cache_hit(self):
+        """Тест: повторный запрос читается из кэша без запросов к БД."""
+        response = self.client.get(self.url, {"page": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url, {"page": 1})
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.json(), response.json())
+        # Другие параметры - другой ключ
+        self.assertEqual(self.client.get(self.url, {"page_size": 1})["X-Cache"], "MISS")
+
+        stats = response_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_response_cache_invalidation(self):
+        """Тест: изменение задач и сотрудников сбрасывает кэш."""
+        urls = [
+            self.url,
+            reverse("tracker:employee-tasks-list"),
+            reverse("tracker:important-tasks-list"),
+            reverse("tracker:employees-list"),
+        ]
+        changes = [
+            lambda: Task.objects.create(title="New"),
+            lambda: self.task.delete(),
+            lambda: Task.objects.filter(pk=self.task2.pk).update(status="completed"),
+            lambda: Employee.objects.create(full_name="Ivan"),
+        ]
+        for change in changes:
+            for url in urls:
+                self.client.get(url)
+            change()
+            for url in urls:
+                self.assertEqual(self.client.get(url)["X-Cache"], "MISS", url)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": os.path.join(tempfile.gettempdir(), "tracker_test_cache"),
+            }
+        }
+    )
+    def test_response_cache_file_backend(self):
+        """Тест: кэш ответов работает с файловым бэкендом."""
+        self.addCleanup(caches["default"].clear)
+        url = reverse("tracker:employee-tasks-list")
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        self.task.save()
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_response_cache_disabled(self):
+        """Тест: при нулевом времени жизни кэш не используется."""
+        self.assertNotIn("X-Cache", self.client.get(self.url))
+
+    def test_response_cache_stats(self):
+        """Тест: счетчики кэша доступны модератору."""
+        self.client.get(self.url)
+        url = reverse("tracker:cache-stats")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["misses"], 1)
+
+
+class ConditionalGetTests(BaseAPITestCase):
+    """
+    Тесты условных GET-запросов по ETag.
+    """
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_task_retrieve_not_modified(self):
+        """Тест: 304 для неизмененной задачи одним запросом к БД."""
+        url = reverse("tracker:task-retrieve", args=[self.task.pk])
+        response = self.client.get(url)
+        etag = response["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        self.task.title = "Changed"
+        self.task.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_task_list_not_modified(self):
+        """Тест: 304 для неизмененного списка задач, в том числе после удаления."""
+        url = reverse("tracker:task-list")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Другая страница - другой ETag
+        self.assertNotEqual(self.client.get(url, {"page_size": 1})["ETag"], etag)
+
+        self.task.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_task_list_if_modified_since_ignored(self):
+        """Тест: без Last-Modified удаление задачи не дает устаревший 304."""
+        url = reverse("tracker:task-list")
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+        modified_since = http_date(time.time() + 60)
+        self.task.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=modified_since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_task_retrieve_cascade_set_null(self):
+        """Тест: ETag меняется при обнулении связи каскадом без изменения updated_at."""
+        url = reverse("tracker:task-retrieve", args=[self.task.pk])
+        etag = self.client.get(url)["ETag"]
+        self.task2.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["parent_task"])
+
+        etag = response["ETag"]
+        self.employee.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["executor"])
+
+
+class TaskStatisticsTests(BaseAPITestCase):
+    """
+    Тесты статистики задач.
+    """
+
+    url = reverse("tracker:task-statistics")
+
+    def test_task_statistics_single_query(self):
+        """Тест: статистика вычисляется одним запросом."""
+        now = timezone.now()
+        tomorrow, next_week = deadline_bounds(now)
+        Task.objects.filter(pk=self.task.pk).update(
+            deadline=now - timezone.timedelta(hours=1)
+        )
+        Task.objects.create(title="Today", deadline=now + timezone.timedelta(seconds=5))
+        Task.objects.create(
+            title="Done", status="completed", executor=self.employee2, deadline=now
+        )
+        Task.objects.filter(pk=self.parent_task.pk).update(
+            deadline=next_week + timezone.timedelta(days=1)
+        )
+
+        with self.assertNumQueries(1):
+            statistics = task_statistics(now)
+
+        total = statistics["total"]
+        self.assertEqual(total["statuses"]["new"], 3)
+        self.assertEqual(total["statuses"]["in_progress"], 1)
+        self.assertEqual(total["statuses"]["completed"], 1)
+        self.assertEqual(total["overdue"], 1)
+        self.assertEqual(total["deadlines"]["later"], 1)
+        self.assertEqual(total["deadlines"]["no_deadline"], 1)
+        # Задача со сроком через 5 секунд попадает в "сегодня" или, около полуночи, в "эту неделю"
+        self.assertEqual(
+            total["deadlines"]["today"] + total["deadlines"]["this_week"], 1
+        )
+
+        employees = {row["employee"]: row for row in statistics["employees"]}
+        self.assertEqual(employees[self.employee.pk]["statuses"]["new"], 2)
+        self.assertEqual(employees[self.employee.pk]["overdue"], 1)
+        self.assertEqual(employees[self.employee2.pk]["full_name"], "Jane")
+        self.assertEqual(employees[None]["statuses"]["new"], 1)
+
+    def test_task_statistics_cached(self):
+        """Тест: ответ кэшируется до изменения задач."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data, response.data)
+        Task.objects.create(title="New")
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["total"]["statuses"]["new"], 3)
+
+
+class ImportantTasksQueriesTests(BaseAPITestCase):
+    """
+    Тесты количества запросов для списка важных задач.
+    """
+
+    def test_important_tasks_constant_queries(self):
+        """Тест: количество запросов не зависит от количества задач в списке."""
+        url = reverse("tracker:important-tasks-list")
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 1)
+
+        for i in range(10):
+            Task.objects.create(
+                title=f"Subtask {i}", status="new", parent_task=self.task2
+            )
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 11)
+
+    def test_important_tasks_executors(self):
+        """Тест: исполнитель родительской задачи предлагается при перевесе до 2 задач."""
+        url = reverse("tracker:important-tasks-list")
+        response = self.client.get(url)
+        self.assertEqual(response.data[0]["executors"], ["John", "Jane"])
+
+        Task.objects.create(
+            title="Task 3", executor=self.employee2, status="in_progress"
+        )
+        Task.objects.create(
+            title="Task 4", executor=self.employee2, status="in_progress"
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.data[0]["executors"], ["John"])
+
+
+class EmployeeTasksTests(BaseAPITestCase):
+    """
+    Тесты списка сотрудников с задачами.
+    """
+
+    url = reverse("tracker:employee-tasks-list")
+
+    def test_employee_tasks_constant_queries(self):
+        """Тест: количество запросов не зависит от количества сотрудников."""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["results"][0]["full_name"], "Jane")
+        self.assertEqual(response.data["results"][0]["active_task_count"], 1)
+
+        for i in range(10):
+            employee = Employee.objects.create(full_name=f"Employee {i}")
+            Task.objects.create(title=f"Task {i}", executor=employee)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["count"], 12)
+
+    def test_employee_tasks_filter_nested_tasks(self):
+        """Тест: вложенные задачи ограничиваются по статусу и количеству."""
+        response = self.client.get(self.url, {"tasks_status": "in_progress"})
+        tasks_by_employee = {
+            employee["full_name"]: employee["tasks"]
+            for employee in response.data["results"]
+        }
+        self.assertEqual(tasks_by_employee["John"], [])
+        self.assertEqual(len(tasks_by_employee["Jane"]), 1)
+
+        response = self.client.get(self.url, {"tasks_limit": 1})
+        tasks_by_employee = {
+            employee["full_name"]: employee["tasks"]
+            for employee in response.data["results"]
+        }
+        self.assertEqual(len(tasks_by_employee["John"]), 1)
+        self.assertEqual(tasks_by_employee["John"][0]["title"], "Parent Task")
+
+    def test_employee_tasks_invalid_params(self):
+        """Тест: некорректные параметры вложенных задач."""
+        response = self.client.get(self.url, {"tasks_status": "unknown"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for limit in (0, "²", "x"):
+            response = self.client.get(self.url, {"tasks_limit": limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, limit)
+
+
+class AsyncReadViewsTests(BaseAPITestCase):
+    """
+    Тесты асинхронных эндпоинтов чтения.
+    """
+
+    async def test_async_views_match_sync(self):
+        """Тест: асинхронные эндпоинты возвращают те же данные, что и синхронные."""
+        for sync_name, async_name, params in (
+            ("tracker:task-list", "tracker:async-task-list", {}),
+            ("tracker:task-list", "tracker:async-task-list", {"status": "new"}),
+            ("tracker:employee-tasks-list", "tracker:async-employee-tasks-list", {}),
+            ("tracker:important-tasks-list", "tracker:async-important-tasks-list", {}),
+        ):
+            expected = await sync_to_async(self.client.get)(reverse(sync_name), params)
+            response = await self.async_client.get(reverse(async_name), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["X-Cache"], "MISS")
+            self.assertEqual(response.json(), expected.json())
+
+        url = reverse("tracker:async-task-retrieve", kwargs={"pk": self.task.pk})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.json()["title"], "Task 1")
+
+    async def test_async_task_list_pagination(self):
+        """Тест: пагинация асинхронного списка задач."""
+        await Task.objects.abulk_create(Task(title=f"Task {i}") for i in range(20))
+        url = reverse("tracker:async-task-list")
+        response = await self.async_client.get(url)
+        data = response.json()
+        self.assertEqual(data["count"], 23)
+        self.assertEqual(len(data["results"]), 20)
+        self.assertIsNone(data["previous"])
+
+        response = await self.async_client.get(data["next"])
+        data = response.json()
+        self.assertEqual(len(data["results"]), 3)
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+
+    async def test_async_views_errors(self):
+        """Тест: ошибки асинхронных эндпоинтов в формате DRF."""
+        url = reverse("tracker:async-task-retrieve", kwargs={"pk": 0})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.get(
+            reverse("tracker:async-task-list"), {"page_size": 5}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.get(
+            reverse("tracker:async-task-list"), {"executor": "x"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("executor", response.json())
+
+        response = await self.async_client.get(
+            reverse("tracker:async-employee-tasks-list"), {"tasks_limit": 0}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_views_check_permissions(self):
+        """Тест: права доступа синхронного View действуют и для асинхронного."""
+        url = reverse("tracker:async-task-list")
+        with mock.patch.object(
+            TaskListAPIView, "permission_classes", (IsAuthenticated,)
+        ):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertIn("WWW-Authenticate", response)
+
+            token = await sync_to_async(AccessToken.for_user)(self.user)
+            response = await self.async_client.get(
+                url, headers={"Authorization": f"Bearer {token}"}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_benchmark_async_command(self):
+        out = StringIO()
+        call_command(
+            "benchmark_async", clients=5, requests=20, no_cache=True, stdout=out
+        )
+        self.assertIn("sync:", out.getvalue())
+        self.assertIn("async:", out.getvalue())
+
+
+class DatabaseConnectionsTests(APITestCase):
+    """
+    Тесты режимов соединений с БД.
+    """
+
+    def test_benchmark_db_connections_command(self):
+        out = StringIO()
+        call_command("benchmark_db_connections", requests=10, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split(":")[0] for line in lines], list(MODES))
+        self.assertIn("пропущен", lines[-1])
+
+    def test_persistent_connection_reused(self):
+        """Тест: в режиме persistent соединение переживает запросы."""
+        persistent = make_connection(connection.settings_dict, "persistent")
+        try:
+            request_cycle(persistent)
+            raw = persistent.connection
+            request_cycle(persistent)
+            self.assertIs(persistent.connection, raw)
+        finally:
+            persistent.close()
+
+
+class TaskAssignmentTests(BaseAPITestCase):
+    """
+    Тесты сбалансированного распределения важных задач.
+    """
+
+    url = reverse("tracker:important-tasks-assign")
+
+    def setUp(self):
+        super().setUp()
+        # Еще три подзадачи задачи в работе у Jane
+        for i in range(3):
+            Task.objects.create(
+                title=f"Subtask {i}", status="new", parent_task=self.task2
+            )
+
+    def test_assignment_plan(self):
+        """Тест: исполнитель родительской задачи получает задачи до перевеса в 2."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [assignment["full_name"] for assignment in response.data],
+            ["Jane", "Jane", "John", "Jane"],
+        )
+
+    def test_assignment_apply(self):
+        """Тест: исполнители назначаются по плану одним UPDATE."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.moderator)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 4)
+        updates = [
+            query["sql"]
+            for query in queries
+            if 'UPDATE "tracker_task" ' in query["sql"]
+        ]
+        self.assertEqual(len(updates), 1)
+        for assignment in response.data["assignments"]:
+            self.assertEqual(
+                Task.objects.get(pk=assignment["task"]).executor_id,
+                assignment["executor"],
+            )
+        call_command("rebuild_task_counters", "--check", stdout=StringIO())
+
+    def test_assign_important_tasks_command(self):
+        out = StringIO()
+        call_command("assign_important_tasks", apply=True, stdout=out)
+        self.assertIn("Назначено задач: 4", out.getvalue())
+        self.assertEqual(self.employee2.tasks.filter(status="new").count(), 3)
+
+    def test_assignment_plan_scale(self):
+        """Тест: 10 000 задач распределяются между 5 000 сотрудников быстрее секунды."""
+        rnd = random.Random(42)
+        employees = [
+            SimpleNamespace(
+                id=pk, full_name=f"Employee {pk}", active_task_count=rnd.randint(0, 5)
+            )
+            for pk in range(5000)
+        ]
+        workload = EmployeesWorkload(employees)
+        tasks = [(pk, rnd.choice([None, rnd.randrange(5000)])) for pk in range(10000)]
+
+        start = time.perf_counter()
+        plan = workload.plan(tasks)
+        self.assertLess(time.perf_counter() - start, 1)
+
+        self.assertEqual(len(plan), len(tasks))
+        loads = Counter(plan.values())
+        for employee in employees:
+            loads[employee.id] += employee.active_task_count
+        # Задачи без исполнителя родительской задачи выравнивают загрузку
+        self.assertLessEqual(max(loads.values()) - min(loads.values()), 3)
+
+
+class ImportantTasksEquivalenceTests(APITestCase):
+    """
+    Тесты эквивалентности запроса важных задач (EXISTS) прежней формулировке.
+    """
+
+    def test_important_tasks_match_legacy_on_random_trees(self):
+        """Тест: на случайных деревьях задач результаты совпадают."""
+        statuses = [status for status, _ in Task.STATUS_CHOICES]
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                rnd = random.Random(seed)
+                Task.objects.all().delete()
+                tasks = []
+                for i in range(150):
+                    parent = rnd.choice(tasks) if tasks and rnd.random() < 0.8 else None
+                    tasks.append(
+                        Task.objects.create(
+                            title=f"Task {i}",
+                            parent_task=parent,
+                            status=rnd.choice(statuses),
+                        )
+                    )
+                self.assertEqual(
+                    sorted(Task.objects.important().values_list("pk", flat=True)),
+                    sorted(legacy_important_tasks().values_list("pk", flat=True)),
+                )
+
+    def test_benchmark_important_tasks_command(self):
+        """Тест: команда сравнения формулировок выполняется и откатывает данные."""
+        stdout = StringIO()
+        call_command(
+            "benchmark_important_tasks", "--tasks", 300, "--repeat", 1, stdout=stdout
+        )
+        self.assertIn("EXISTS", stdout.getvalue())
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskTreeTests(BaseAPITestCase):
+    """
+    Тесты получения дерева задач.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.child = Task.objects.create(title="Child", parent_task=self.task)
+        self.grandchild = Task.objects.create(
+            title="Grandchild", parent_task=self.child
+        )
+
+    def test_task_subtree(self):
+        """Тест: поддерево задачи возвращается одним запросом."""
+        url = reverse("tracker:task-tree", kwargs={"pk": self.task2.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(task["title"], task["depth"]) for task in response.data],
+            [("Task 2", 0), ("Task 1", 1), ("Child", 2), ("Grandchild", 3)],
+        )
+
+        response = self.client.get(url, {"depth": 1})
+        self.assertEqual(
+            [task["title"] for task in response.data], ["Task 2", "Task 1"]
+        )
+
+    def test_task_ancestors(self):
+        """Тест: цепочка родительских задач."""
+        url = reverse("tracker:task-tree", kwargs={"pk": self.grandchild.id})
+        response = self.client.get(url, {"direction": "ancestors"})
+        self.assertEqual(
+            [task["title"] for task in response.data],
+            ["Grandchild", "Child", "Task 1", "Task 2"],
+        )
+
+    def test_task_tree_with_cycle(self):
+        """Тест: цикл в родительских задачах ограничивается глубиной обхода."""
+        Task.objects.filter(pk=self.task2.pk).update(parent_task=self.grandchild)
+        url = reverse("tracker:task-tree", kwargs={"pk": self.task2.id})
+        response = self.client.get(url, {"depth": 5})
+        self.assertEqual(len(response.data), 6)
+
+    def test_task_tree_errors(self):
+        """Тест: несуществующая задача и некорректные параметры."""
+        url = reverse("tracker:task-tree", kwargs={"pk": 0})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse("tracker:task-tree", kwargs={"pk": self.task.id})
+        response = self.client.get(url, {"direction": "up"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for depth in ("-1", "²", "x"):
+            response = self.client.get(url, {"depth": depth})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, depth)
+
+
+class TaskCursorPaginationTests(BaseAPITestCase):
+    """
+    Тесты курсорной пагинации списка задач.
+    """
+
+    def test_cursor_pagination_walks_all_tasks_once(self):
+        """Тест: обход по курсору возвращает каждую задачу ровно один раз."""
+        deadline = timezone.now() + timezone.timedelta(days=3)
+        for i in range(6):
+            Task.objects.create(title=f"Same deadline {i}", deadline=deadline)
+            Task.objects.create(title=f"No deadline {i}")
+
+        url = reverse("tracker:task-list-cursor")
+        params = {"page_size": 4}
+        titles = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # Не больше одного запроса на каждый диапазон ключа, без COUNT(*)
+            self.assertLessEqual(len(queries), 3)
+            titles += [task["title"] for task in response.data["results"]]
+            url, params = response.data["next"], None
+
+        expected = list(
+            Task.objects.order_by(
+                F("deadline").desc(nulls_last=True), "-id"
+            ).values_list("title", flat=True)
+        )
+        self.assertEqual(titles, expected)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        """Тест: некорректный курсор."""
+        url = reverse("tracker:task-list-cursor")
+        response = self.client.get(url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskSearchTests(BaseAPITestCase):
+    """
+    Тесты полнотекстового поиска задач.
+    """
+
+    url = reverse("tracker:task-search")
+
+    def search(self, text):
+        return list(Task.objects.search(text).values_list("title", flat=True))
+
+    def test_task_search_ranked(self):
+        """Тест: совпадение в названии релевантнее совпадения в описании."""
+        Task.objects.create(title="Отчет", description="Проверить сервер")
+        Task.objects.create(title="Сервер", description="Обновить конфигурацию")
+        response = self.client.get(self.url, {"q": "сервер"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Набор результатов зависит от морфологии СУБД: проверяем только порядок
+        ranks = {task["title"]: task["rank"] for task in response.data["results"]}
+        self.assertEqual(list(ranks)[:2], ["Сервер", "Отчет"])
+        self.assertGreater(ranks["Сервер"], ranks["Отчет"])
+        self.assertEqual(self.search("отчет"), ["Отчет"])
+
+    def test_task_search_index_updated(self):
+        """Тест: индекс поиска обновляется при сохранении и массовых операциях."""
+        self.task.title = "Миграция базы"
+        self.task.save()
+        self.assertEqual(self.search("миграция"), ["Миграция базы"])
+
+        Task.objects.filter(pk=self.task.pk).update(title="Резервная копия")
+        self.assertEqual(self.search("миграция"), [])
+        Task.objects.bulk_create([Task(title="Копия логов")])
+        self.assertEqual(set(self.search("копия")), {"Резервная копия", "Копия логов"})
+
+        Task.objects.filter(title="Копия логов").delete()
+        self.assertEqual(self.search("копия"), ["Резервная копия"])
+
+    def test_task_search_pagination(self):
+        """Тест: курсорная пагинация по релевантности без повторов."""
+        for i in range(7):
+            Task.objects.create(title=f"Релиз {i}", description="релиз " * (i % 3))
+        params = {"q": "релиз", "page_size": 3}
+        url, titles = self.url, []
+        while url:
+            response = self.client.get(url, params)
+            titles += [task["title"] for task in response.data["results"]]
+            url, params = response.data["next"], None
+        expected = Task.objects.search("релиз").order_by("-rank", "-id")
+        self.assertEqual(titles, [task.title for task in expected])
+        self.assertEqual(len(titles), 7)
+
+    def test_task_search_query_syntax(self):
+        """Тест: пустой запрос и операторы языка запросов."""
+        response = self.client.get(self.url, {"q": " "})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"q": '" * - OR'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search('Task" OR "1'), [])
+        self.assertEqual(self.search("task:1"), ["Task 1"])
+
+
+class QueryPlanTests(APITestCase):
+    """
+    Тесты планов запросов View на реалистичном объеме данных:
+    таблица задач не должна читаться последовательным сканированием.
+    """
+
+    # Маркеры полного сканирования таблицы в выводе EXPLAIN
+    SEQ_SCAN_PATTERNS = {
+        "postgresql": re.compile(r"Seq Scan on (\w+)"),
+        "sqlite": re.compile(r"\bSCAN (\w+)$", re.MULTILINE),
+    }
+    EMPLOYEES_COUNT = 200
+    TASKS_COUNT = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        rnd = random.Random(42)
+        now = timezone.now()
+        # Большинство задач в трекере завершены
+        statuses = ["completed"] * 16 + ["new", "in_progress", "on_review", "canceled"]
+        employees = Employee.objects.bulk_create(
+            Employee(full_name=f"Employee {i}") for i in range(cls.EMPLOYEES_COUNT)
+        )
+        parents = Task.objects.bulk_create(
+            Task(
+                title=f"Parent {i}",
+                executor=rnd.choice(employees),
+                status=rnd.choice(statuses),
+                deadline=now + timezone.timedelta(hours=rnd.randint(0, 5000)),
+            )
+            for i in range(cls.TASKS_COUNT // 5)
+        )
+        Task.objects.bulk_create(
+            Task(
+                title=f"Task {i}",
+                parent_task=rnd.choice(parents),
+                executor=rnd.choice(employees),
+                status=rnd.choice(statuses),
+                deadline=rnd.choice(
+                    [None, now + timezone.timedelta(hours=rnd.randint(0, 5000))]
+                ),
+            )
+            for i in range(cls.TASKS_COUNT - len(parents))
+        )
+        cls.employee_ids = [employee.pk for employee in employees[:20]]
+        cls.task = parents[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertNoSeqScan(self, queryset, allowed=()):
+        """Проверяет, что в плане запроса нет полного сканирования таблиц"""
+        pattern = self.SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f"Разбор EXPLAIN для {connection.vendor} не реализован")
+        plan = queryset.explain()
+        scanned = set(pattern.findall(plan)) - set(allowed)
+        self.assertFalse(scanned, f"Последовательное сканирование {scanned}:\n{plan}")
+
+    def get_view(self, view_class, **params):
+        view = view_class()
+        view.request = Request(APIRequestFactory().get("/", params))
+        view.kwargs = {}
+        return view
+
+    def test_task_list_plan(self):
+        queryset = self.get_view(TaskListAPIView).get_queryset()
+        self.assertNoSeqScan(queryset[:20])
+
+    def test_task_list_filters_plan(self):
+        """Любое сочетание фильтров списка задач читается по индексам"""
+        now = timezone.now()
+        filters = {
+            "status": ["new", "in_progress"],
+            "executor": self.employee_ids[0],
+            "parent_task": self.task.pk,
+            "deadline_after": (now + timezone.timedelta(days=10)).isoformat(),
+            "deadline_before": (now + timezone.timedelta(days=20)).isoformat(),
+            "overdue": "true",
+            "updated_since": (now + timezone.timedelta(minutes=1)).isoformat(),
+        }
+        for size in range(1, len(filters) + 1):
+            for names in itertools.combinations(filters, size):
+                view = self.get_view(
+                    TaskListAPIView, **{name: filters[name] for name in names}
+                )
+                # Без сортировки: индекс должен использоваться для отбора,
+                # а не только для сортировки по сроку
+                queryset = view.filter_queryset(view.get_queryset()).order_by()
+                with self.subTest(filters=names):
+                    self.assertNoSeqScan(queryset)
+
+    def test_task_retrieve_plan(self):
+        queryset = self.get_view(TaskRetrieveAPIView).get_queryset()
+        self.assertNoSeqScan(queryset.filter(pk=self.task.pk))
+
+    def test_task_cursor_list_plan(self):
+        queryset = self.get_view(TaskCursorListAPIView).get_queryset()
+        for position in (
+            None,
+            (self.task.deadline, self.task.pk),
+            (None, self.task.pk),
+        ):
+            for condition, ordering in DeadlineCursorPagination.get_ranges(position):
+                self.assertNoSeqScan(
+                    queryset.filter(condition).order_by(*ordering)[:21]
+                )
+
+    def test_employee_tasks_plan(self):
+        view = self.get_view(EmployeeTasksAPIView, tasks_status="in_progress")
+        # Список сотрудников читается целиком, задачи - только по индексам
+        self.assertNoSeqScan(view.get_queryset()[:20], allowed=("tracker_employee",))
+        tasks = view.get_tasks_queryset().filter(executor_id__in=self.employee_ids)
+        self.assertNoSeqScan(tasks)
+
+    def test_important_tasks_plan(self):
+        queryset = self.get_view(ImportantTasksAPIView).get_queryset()
+        self.assertNoSeqScan(queryset[:20])
+
+    def test_task_search_plan(self):
+        self.assertNoSeqScan(Task.objects.search("Parent 42").order_by("-rank")[:20])
+
+    def test_employees_workload_plan(self):
+        queryset = Employee.objects.with_task_count().order_by("active_task_count")
+        self.assertNoSeqScan(queryset, allowed=("tracker_employee",))
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, RESPONSE_CACHE_TIMEOUT=0)
+class ServerTimingTests(BaseAPITestCase):
+    """
+    Тесты замеров Server-Timing.
+    """
+
+    def server_timing(self, response):
+        return dict(
+            metric.split(";", 1) for metric in response["Server-Timing"].split(", ")
+        )
+
+    def test_server_timing_header_and_log(self):
+        """Тест: заголовок и строка лога с количеством запросов и этапами."""
+        url = reverse("tracker:task-list")
+        with self.assertLogs("tracker.timing") as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        metrics = self.server_timing(response)
+        self.assertIn(f'desc="{len(queries)} queries"', metrics["db"])
+        self.assertEqual(set(metrics), {"db", "view", "serialize", "render", "total"})
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["path"], url)
+        self.assertEqual(entry["queries"], len(queries))
+        self.assertEqual(entry["size"], len(response.content))
+        self.assertEqual(logs.records[0].server_timing, entry)
+
+    def test_server_timing_async_view(self):
+        """Тест: запросы асинхронного ORM тоже учитываются."""
+        with self.assertLogs("tracker.timing"):
+            response = self.client.get(reverse("tracker:async-task-list"))
+        self.assertIn('desc="2 queries"', self.server_timing(response)["db"])
+
+    def test_server_timing_sampling(self):
+        """Тест: замеры выключены при нулевой доле запросов."""
+        with override_settings(SERVER_TIMING_SAMPLE_RATE=0):
+            response = self.client_class().get(reverse("tracker:task-list"))
+        self.assertNotIn("Server-Timing", response)
+
+
+@override_settings(
+    QUERY_DETECTOR=True, QUERY_DETECTOR_REPEAT_THRESHOLD=2, RESPONSE_CACHE_TIMEOUT=0
+)
+class QueryDetectorTests(BaseAPITestCase):
+    """
+    Тесты детектора N+1 и медленных запросов.
+    """
+
+    url = reverse("tracker:employee-tasks-list")
+
+    def without_task_count(self):
+        """Список сотрудников без аннотации: количество задач считается для каждого"""
+        return mock.patch.object(
+            EmployeeTasksAPIView,
+            "get_queryset",
+            lambda view: Employee.objects.order_by("id").prefetch_related(
+                Prefetch("tasks", to_attr="selected_tasks")
+            ),
+        )
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT * FROM t WHERE a = %s AND b IN (1, 2,  3) AND c = 'x'"
+            ),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) AND c = ?",
+        )
+
+    @override_settings(QUERY_DETECTOR_STRICT=True)
+    def test_query_detector_strict(self):
+        """Тест: повторяющийся запрос из сериализатора вызывает ошибку."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.without_task_count(), self.assertRaises(QueryDetectorError) as error:
+            self.client.get(self.url)
+        entry = json.loads(str(error.exception))
+        [finding] = entry["findings"]
+        self.assertEqual(finding["kind"], "repeated")
+        self.assertEqual(finding["count"], 2)
+        self.assertIn("get_active_task_count", finding["stack"][-1])
+
+    def test_query_detector_report(self):
+        """Тест: находки дописываются в отчет, медленные запросы тоже."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.jsonl")
+            with override_settings(
+                QUERY_DETECTOR_REPORT=path,
+                QUERY_DETECTOR_SLOW_MS=0,
+                QUERY_DETECTOR_STRICT=False,
+            ):
+                with self.assertLogs("tracker.query_detector", "WARNING"):
+                    self.client.get(
+                        reverse("tracker:task-retrieve", args=[self.task.pk])
+                    )
+            with open(path, encoding="utf-8") as report:
+                [entry] = map(json.loads, report)
+        self.assertEqual({finding["kind"] for finding in entry["findings"]}, {"slow"})
+        self.assertEqual(entry["queries"], len(entry["findings"]))
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0)
+class QueryBudgetTests(APITestCase):
+    """
+    Бюджет запросов эндпоинтов чтения: количество запросов не превышает бюджет
+    и не зависит от объема данных (проверяется на N и 10×N сотрудников и задач).
+    Время ответов записывается в JSON-отчет QUERY_BUDGET_REPORT. Если задан
+    QUERY_BUDGET_BASELINE (отчет прошлого запуска), время ответа на 10×N не должно
+    превышать время из него более чем в QUERY_BUDGET_TOLERANCE раз.
+    """
+
+    n = int(os.getenv("QUERY_BUDGET_N", 20))
+    repeat = 3
+    ROOT_PK = 1_000_000
+
+    # Эндпоинт: (имя URL, kwargs, параметры запроса, бюджет запросов)
+    endpoints = {
+        "task-list": ("tracker:task-list", {}, {}, 3),
+        "task-list-filtered": (
+            "tracker:task-list",
+            {},
+            {"status": ["new", "in_progress"], "overdue": "false"},
+            3,
+        ),
+        "task-list-cursor": ("tracker:task-list-cursor", {}, {}, 1),
+        "task-search": ("tracker:task-search", {}, {"q": "budget"}, 1),
+        "task-retrieve": ("tracker:task-retrieve", {"pk": ROOT_PK}, {}, 2),
+        "task-tree": ("tracker:task-tree", {"pk": ROOT_PK}, {}, 1),
+        "task-export": ("tracker:task-export", {}, {}, 2),
+        "task-statistics": ("tracker:task-statistics", {}, {}, 1),
+        "employees": ("tracker:employees-list", {}, {}, 1),
+        "employees-tasks": ("tracker:employee-tasks-list", {}, {}, 3),
+        "important-tasks": ("tracker:important-tasks-list", {}, {}, 2),
+        "async-task-list": ("tracker:async-task-list", {}, {}, 2),
+        "async-task-retrieve": ("tracker:async-task-retrieve", {"pk": ROOT_PK}, {}, 1),
+        "async-employees-tasks": ("tracker:async-employee-tasks-list", {}, {}, 3),
+        "async-important-tasks": ("tracker:async-important-tasks-list", {}, {}, 2),
+    }
+
+    def seed(self, count):
+        """
+        Дополняет данные до count сотрудников, у каждого из которых задача
+        в работе (подзадача корневой задачи) и новая подзадача к ней
+        """
+        if not Task.objects.filter(pk=self.ROOT_PK).exists():
+            Task.objects.create(
+                pk=self.ROOT_PK, title="Budget root", status="in_progress"
+            )
+        start = Employee.objects.count()
+        deadline = timezone.now() + timezone.timedelta(days=30)
+        employees = Employee.objects.bulk_create(
+            Employee(full_name=f"Employee {i}") for i in range(start, count)
+        )
+        parents = Task.objects.bulk_create(
+            Task(
+                title=f"Budget task {employee.full_name}",
+                executor=employee,
+                parent_task_id=self.ROOT_PK,
+                status="in_progress",
+                deadline=deadline,
+            )
+            for employee in employees
+        )
+        Task.objects.bulk_create(
+            Task(
+                title=f"Budget subtask {parent.pk}",
+                description="Подзадача для проверки бюджета запросов",
+                executor=parent.executor,
+                parent_task=parent,
+                deadline=deadline,
+            )
+            for parent in parents
+        )
+
+    def measure(self, url, params):
+        """:returns: количество запросов и лучшее время ответа в секундах"""
+        timings = []
+        for _ in range(self.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = self.client.get(url, params)
+                response.getvalue()
+                timings.append(time.perf_counter() - start)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(queries), min(timings)
+
+    def measure_all(self, count):
+        self.seed(count)
+        return {
+            name: self.measure(reverse(url_name, kwargs=kwargs), params)
+            for name, (url_name, kwargs, params, _) in self.endpoints.items()
+        }
+
+    def test_query_budget(self):
+        small = self.measure_all(self.n)
+        large = self.measure_all(self.n * 10)
+        report = {"n": self.n, "endpoints": {}}
+        for name, (_, _, _, budget) in self.endpoints.items():
+            report["endpoints"][name] = {
+                "budget": budget,
+                "queries": small[name][0],
+                "queries_10n": large[name][0],
+                "seconds": small[name][1],
+                "seconds_10n": large[name][1],
+            }
+            with self.subTest(endpoint=name):
+                self.assertEqual(small[name][0], large[name][0])
+                self.assertLessEqual(large[name][0], budget)
+
+        if os.getenv("QUERY_BUDGET_REPORT"):
+            with open(os.getenv("QUERY_BUDGET_REPORT"), "w") as file:
+                json.dump(report, file, indent=2)
+
+        if os.getenv("QUERY_BUDGET_BASELINE"):
+            with open(os.getenv("QUERY_BUDGET_BASELINE")) as file:
+                baseline = json.load(file)["endpoints"]
+            tolerance = float(os.getenv("QUERY_BUDGET_TOLERANCE", 2))
+            for name, result in report["endpoints"].items():
+                if name in baseline:
+                    with self.subTest(endpoint=name):
+                        self.assertLessEqual(
+                            result["seconds_10n"],
+                            baseline[name]["seconds_10n"] * tolerance,
+                        )
+
+
+class TaskCounterTests(BaseAPITestCase):
+    """
+    Тесты счетчиков задач сотрудников.
+    """
+
+    def counter(self, employee, status="in_progress"):
+        counter = TaskCounter.objects.filter(employee=employee, status=status).first()
+        return counter.count if counter else 0
+
+    def test_counters_on_save_and_delete(self):
+        """Тест: счетчики меняются при создании, смене статуса, исполнителя и удалении."""
+        self.assertEqual(self.counter(self.employee2), 1)
+        self.assertEqual(self.counter(self.employee, "new"), 2)
+
+        self.task.status = "in_progress"
+        self.task.save()
+        self.assertEqual(self.counter(self.employee), 1)
+        self.assertEqual(self.counter(self.employee, "new"), 1)
+
+        self.task.executor = self.employee2
+        self.task.save()
+        self.assertEqual(self.counter(self.employee), 0)
+        self.assertEqual(self.counter(self.employee2), 2)
+
+        self.task.delete()
+        self.assertEqual(self.counter(self.employee2), 1)
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_bulk_operations_lock_tasks(self):
+        """Тест: массовые операции блокируют задачи до подсчета счетчиков."""
+        operations = {
+            "update": lambda: Task.objects.filter(executor=self.employee).update(
+                status="completed"
+            ),
+            "bulk_update": lambda: Task.objects.bulk_update(
+                [Task(pk=self.task.pk, status="on_review")], ["status"]
+            ),
+            "assign_executors": lambda: Task.objects.assign_executors(
+                {self.task.pk: self.employee2.pk}
+            ),
+            "delete": lambda: Task.objects.filter(pk=self.task.pk).delete(),
+        }
+        for name, operation in operations.items():
+            with self.subTest(name), mock.patch.object(
+                TaskQuerySet,
+                "select_for_update",
+                autospec=True,
+                side_effect=TaskQuerySet.select_for_update,
+            ) as select_for_update:
+                operation()
+                select_for_update.assert_called_once()
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_counters_on_bulk_operations(self):
+        """Тест: счетчики поддерживаются при массовых операциях."""
+        Task.objects.bulk_create(
+            [
+                Task(title=f"Bulk {i}", executor=self.employee, status="in_progress")
+                for i in range(3)
+            ]
+        )
+        self.assertEqual(self.counter(self.employee), 3)
+
+        Task.objects.filter(executor=self.employee).update(status="completed")
+        self.assertEqual(self.counter(self.employee), 0)
+        self.assertEqual(self.counter(self.employee, "completed"), 5)
+
+        Task.objects.filter(status="completed").update(executor=self.employee2)
+        self.assertEqual(self.counter(self.employee2, "completed"), 5)
+
+        Task.objects.filter(title__startswith="Bulk").delete()
+        self.assertEqual(self.counter(self.employee2, "completed"), 2)
+        self.assertEqual(TaskCounter.objects.mismatches(), {})
+
+    def test_apply_deltas_creates_missing_counters(self):
+        """Тест: отсутствующий счетчик создается, изменения суммируются."""
+        TaskCounter.objects.filter(employee=self.employee).delete()
+        TaskCounter.objects.apply_deltas(
+            {(self.employee.pk, "on_review"): 2, (self.employee2.pk, "in_progress"): 1}
+        )
+        TaskCounter.objects.apply_deltas({(self.employee.pk, "on_review"): 3})
+        self.assertEqual(self.counter(self.employee, "on_review"), 5)
+        self.assertEqual(self.counter(self.employee2), 2)
+
+    def test_rebuild_task_counters_command(self):
+        """Тест: команда находит расхождения и пересчитывает счетчики."""
+        TaskCounter.objects.filter(employee=self.employee2).update(count=10)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_task_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_task_counters", stdout=StringIO())
+        self.assertEqual(self.counter(self.employee2), 1)
+        call_command("rebuild_task_counters", "--check", stdout=StringIO())
@@ -0,0 +1,142 @@
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from tracker.sql_recorder import QueryRecorderMiddleware
+
+logger = logging.getLogger(__name__)
+
+# Замеры текущего запроса, если он попал в выборку
+current_timing = ContextVar("current_timing", default=None)
+
+
+class RequestTiming:
+    """Замеры одного запроса: длительности этапов и запросы к БД"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = {}
+        self.queries = 0
+        self.view_start = None
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0) + seconds
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.add("db", seconds)
+
+    def view_done(self):
+        if self.view_start is not None and "view" not in self.durations:
+            self.add("view", time.perf_counter() - self.view_start)
+
+
+@contextmanager
+def timing_span(name):
+    """Учитывает время выполнения блока в замерах текущего запроса"""
+    record = current_timing.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.add(name, time.perf_counter() - start)
+
+
+@functools.cache
+def timed_serializer_class(serializer_class):
+    """Подкласс сериализатора, учитывающий время serializer.data"""
+
+    class TimedSerializer(serializer_class):
+        @property
+        def data(self):
+            with timing_span("serialize"):
+                return super().data
+
+    TimedSerializer.__name__ = serializer_class.__name__
+    TimedSerializer.__qualname__ = serializer_class.__qualname__
+    return TimedSerializer
+
+
+class ServerTimingSerializerMixin:
+    """Учитывает время сериализации ответа в Server-Timing для GenericAPIView"""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if current_timing.get() is not None:
+            serializer.__class__ = timed_serializer_class(serializer.__class__)
+        return serializer
+
+
+class ServerTimingMiddleware(QueryRecorderMiddleware):
+    """
+    Замеры запросов: количество и время SQL, время View, сериализации и рендеринга,
+    общее время и размер ответа. Отдаются в заголовке Server-Timing и пишутся
+    в лог tracker.timing строкой JSON.
+    Замеряется доля SERVER_TIMING_SAMPLE_RATE запросов; при 0 middleware
+    не подключается совсем и ничего не стоит.
+    """
+
+    current = current_timing
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def start(self, request):
+        if random.random() < self.sample_rate:
+            return RequestTiming()
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        record = current_timing.get()
+        if record is not None:
+            record.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        """DRF Response рендерится после View: замеряем рендеринг отдельно"""
+        record = current_timing.get()
+        if record is not None:
+            record.view_done()
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: record.add("render", time.perf_counter() - start)
+            )
+        return response
+
+    def finish(self, request, response, record):
+        record.view_done()
+        record.add("total", time.perf_counter() - record.start)
+        size = None if response.streaming else len(response.content)
+
+        durations = {"db": 0, **record.durations}
+        metrics = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations.items()
+        ]
+        metrics[0] += f';desc="{record.queries} queries"'
+        response["Server-Timing"] = ", ".join(metrics)
+
+        payload = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": record.queries,
+            **{
+                f"{name}_ms": round(seconds * 1000, 2)
+                for name, seconds in durations.items()
+            },
+            "size": size,
+        }
+        logger.info(json.dumps(payload), extra={"server_timing": payload})
+        return response
@@ -2,10 +2,18 @@ from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from tracker.apps import TrackerConfig
+from tracker.async_views import (AsyncEmployeeTasksView,
+                                 AsyncImportantTasksView, AsyncTaskListView,
+                                 AsyncTaskRetrieveView)
 from tracker.views import (EmployeeTasksAPIView, EmployeeViewSet,
-                           ImportantTasksAPIView, TaskCreateAPIView,
-                           TaskDeleteAPIView, TaskListAPIView,
-                           TaskRetrieveAPIView, TaskUpdateAPIView)
+                           ImportantTasksAPIView, ResponseCacheStatsAPIView,
+                           TaskAssignmentAPIView, TaskBulkCreateAPIView,
+                           TaskBulkUpdateAPIView, TaskCreateAPIView,
+                           TaskCursorListAPIView, TaskDeleteAPIView,
+                           TaskExportAPIView, TaskListAPIView,
+                           TaskRetrieveAPIView, TaskSearchAPIView,
+                           TaskStatisticsAPIView, TaskTreeAPIView,
+                           TaskUpdateAPIView)
 
 app_name = TrackerConfig.name
 
@@ -14,8 +22,14 @@ router.register(r"employees", EmployeeViewSet, basename="employees")
 
 urlpatterns = [
     path("task-list/", TaskListAPIView.as_view(), name="task-list"),
+    path("task-list/cursor/", TaskCursorListAPIView.as_view(), name="task-list-cursor"),
+    path("task/export/", TaskExportAPIView.as_view(), name="task-export"),
+    path("task/search/", TaskSearchAPIView.as_view(), name="task-search"),
     path("task/<int:pk>/", TaskRetrieveAPIView.as_view(), name="task-retrieve"),
+    path("task/<int:pk>/tree/", TaskTreeAPIView.as_view(), name="task-tree"),
     path("task/create/", TaskCreateAPIView.as_view(), name="task-create"),
+    path("task/bulk-create/", TaskBulkCreateAPIView.as_view(), name="task-bulk-create"),
+    path("task/bulk-update/", TaskBulkUpdateAPIView.as_view(), name="task-bulk-update"),
     path("task/update/<int:pk>/", TaskUpdateAPIView.as_view(), name="task-update"),
     path("task/delete/<int:pk>/", TaskDeleteAPIView.as_view(), name="task-delete"),
     path(
@@ -24,6 +38,30 @@ urlpatterns = [
     path(
         "important-tasks/", ImportantTasksAPIView.as_view(), name="important-tasks-list"
     ),
+    path(
+        "important-tasks/assign/",
+        TaskAssignmentAPIView.as_view(),
+        name="important-tasks-assign",
+    ),
+    path("task/statistics/", TaskStatisticsAPIView.as_view(), name="task-statistics"),
+    # Асинхронные версии эндпоинтов чтения (для запуска под ASGI, например uvicorn)
+    path("async/task-list/", AsyncTaskListView.as_view(), name="async-task-list"),
+    path(
+        "async/task/<int:pk>/",
+        AsyncTaskRetrieveView.as_view(),
+        name="async-task-retrieve",
+    ),
+    path(
+        "async/employees-tasks/",
+        AsyncEmployeeTasksView.as_view(),
+        name="async-employee-tasks-list",
+    ),
+    path(
+        "async/important-tasks/",
+        AsyncImportantTasksView.as_view(),
+        name="async-important-tasks-list",
+    ),
+    path("cache-stats/", ResponseCacheStatsAPIView.as_view(), name="cache-stats"),
 ]
 
 urlpatterns += router.urls
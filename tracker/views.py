@@ -1,19 +1,56 @@
-from django.db.models import Count, Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
-                                     ListAPIView, RetrieveAPIView,
-                                     UpdateAPIView)
+                                     GenericAPIView, ListAPIView,
+                                     RetrieveAPIView, UpdateAPIView)
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from tracker.models import Employee, Task
-from tracker.paginators import CustomPagination
+from tracker.cache import CachedListMixin, ConditionalGetMixin, response_cache
+from tracker.filters import TaskFilterSet
+from tracker.models import MAX_TREE_DEPTH, Employee, Task
+from tracker.paginators import (CustomPagination, DeadlineCursorPagination,
+                                RankCursorPagination)
 from tracker.serializers import (EmployeeSerializer, EmployeeTasksSerializer,
-                                 ImportantTaskSerializer, TaskSerializer)
+                                 ImportantTaskSerializer,
+                                 TaskBulkCreateSerializer,
+                                 TaskBulkUpdateSerializer,
+                                 TaskSearchSerializer, TaskSerializer,
+                                 TaskTreeSerializer)
+from tracker.services import (EXPORT_FORMATS, EmployeesWorkload,
+                              apply_assignment_plan, assignment_plan,
+                              stream_tasks, task_statistics)
+from tracker.timing import ServerTimingSerializerMixin
 from users.permissions import IsModer, IsOwner
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
-    """ViewSet для сотрудников"""
+def int_query_param(request, name, default, min_value, max_value):
+    """
+    Целое число из параметра запроса в пределах [min_value, max_value].
+    Проверяется через int(): str.isdigit() пропускает символы вроде "²",
+    которые int() не разбирает.
+    """
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = None
+    if value is None or not min_value <= value <= max_value:
+        raise ValidationError(
+            {name: f"Укажите целое число от {min_value} до {max_value}"}
+        )
+    return value
+
+
+class EmployeeViewSet(
+    ServerTimingSerializerMixin, CachedListMixin, viewsets.ModelViewSet
+):
+    """ViewSet для сотрудников (список кэшируется)"""
 
     serializer_class = EmployeeSerializer
     queryset = Employee.objects.all()
@@ -37,22 +74,115 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class TaskListAPIView(ListAPIView):
-    """View просмотра списка всех задач"""
+class TaskListAPIView(
+    ServerTimingSerializerMixin, ConditionalGetMixin, CachedListMixin, ListAPIView
+):
+    """
+    View просмотра списка всех задач с фильтрами TaskFilterSet:
+    status (несколько значений), executor, parent_task, deadline_after, deadline_before,
+    overdue, updated_since.
+    Ответы кэшируются, поддерживаются условные запросы по ETag
+    """
 
     serializer_class = TaskSerializer
     queryset = Task.objects.all()
     pagination_class = CustomPagination
     permission_classes = (AllowAny,)
+    filterset_class = TaskFilterSet
+
+
+class TaskCursorListAPIView(TaskListAPIView):
+    """View просмотра списка всех задач с курсорной пагинацией по (deadline, id)"""
+
+    pagination_class = DeadlineCursorPagination
+    # Курсорная пагинация обходится без COUNT(*) по всей выборке
+    conditional_get = False
+
+
+class TaskExportAPIView(TaskListAPIView):
+    """
+    View потоковой выгрузки задач в NDJSON или CSV (параметр export_format)
+    с теми же фильтрами, что и список задач
+    """
+
+    pagination_class = None
+    # Выгрузка отдается потоком: агрегат по всей выборке для ETag не нужен
+    conditional_get = False
+
+    def list(self, request, *args, **kwargs):
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"export_format": f"Допустимые форматы: {', '.join(EXPORT_FORMATS)}"}
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            stream_tasks(queryset, export_format),
+            content_type=f"{EXPORT_FORMATS[export_format]}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks.{export_format}"'
+        )
+        return response
+
+
+class TaskSearchAPIView(ServerTimingSerializerMixin, ListAPIView):
+    """
+    View полнотекстового поиска задач по названию и описанию (параметр q).
+    Задачи упорядочены по релевантности, пагинация курсорная по (rank, id)
+    """
+
+    serializer_class = TaskSearchSerializer
+    pagination_class = RankCursorPagination
+    permission_classes = (AllowAny,)
+
+    def get_queryset(self):
+        text = self.request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "Укажите поисковый запрос"})
+        return Task.objects.search(text)
 
 
-class TaskRetrieveAPIView(RetrieveAPIView):
-    """View просмотра задачи"""
+class TaskRetrieveAPIView(
+    ServerTimingSerializerMixin, ConditionalGetMixin, RetrieveAPIView
+):
+    """View просмотра задачи (с условными запросами по ETag)"""
 
     serializer_class = TaskSerializer
     queryset = Task.objects.all()
     permission_classes = (AllowAny,)
 
+    def get_conditional_queryset(self):
+        return super().get_conditional_queryset().filter(pk=self.kwargs["pk"])
+
+
+class TaskTreeAPIView(ServerTimingSerializerMixin, GenericAPIView):
+    """
+    View просмотра дерева задачи одним запросом.
+    Параметры:
+    - direction: descendants (поддерево, по умолчанию) или ancestors (родительские задачи)
+    - depth: максимальная глубина обхода
+    """
+
+    serializer_class = TaskTreeSerializer
+    permission_classes = (AllowAny,)
+
+    def get(self, request, pk):
+        direction = request.query_params.get("direction", "descendants")
+        if direction not in ("descendants", "ancestors"):
+            raise ValidationError(
+                {"direction": "Допустимые значения: descendants, ancestors"}
+            )
+
+        depth = int_query_param(request, "depth", MAX_TREE_DEPTH, 0, MAX_TREE_DEPTH)
+        tasks = list(
+            Task.objects.tree(pk, ancestors=direction == "ancestors", max_depth=depth)
+        )
+        if not tasks:
+            raise NotFound("Задача не найдена.")
+        serializer = self.get_serializer(tasks, many=True)
+        return Response(serializer.data)
+
 
 class TaskCreateAPIView(CreateAPIView):
     """View создания задачи"""
@@ -61,6 +191,44 @@ class TaskCreateAPIView(CreateAPIView):
     permission_classes = (IsAuthenticated, IsModer)
 
 
+class TaskBulkCreateAPIView(CreateAPIView):
+    """View пакетного создания задач"""
+
+    serializer_class = TaskBulkCreateSerializer
+    permission_classes = (IsAuthenticated, IsModer)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["many"] = True
+        kwargs["allow_empty"] = False
+        return super().get_serializer(*args, **kwargs)
+
+
+class TaskBulkUpdateAPIView(GenericAPIView):
+    """
+    View массового изменения статуса и/или исполнителя задач одним UPDATE.
+    Возвращает id измененных задач.
+    """
+
+    serializer_class = TaskBulkUpdateSerializer
+    permission_classes = (IsAuthenticated, IsModer)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            ids = list(
+                serializer.get_tasks()
+                .select_for_update()
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            if ids:
+                Task.objects.filter(pk__in=ids).update(
+                    **serializer.get_changes(), updated_at=timezone.now()
+                )
+        return Response({"updated": ids})
+
+
 class TaskUpdateAPIView(UpdateAPIView):
     """View изменения задачи"""
 
@@ -76,21 +244,62 @@ class TaskDeleteAPIView(DestroyAPIView):
     permission_classes = (IsAuthenticated, IsModer)
 
 
-class EmployeeTasksAPIView(ListAPIView):
-    """View для вывода списка сотрудников в порядке убывания количества активных задач"""
+class EmployeeTasksAPIView(ServerTimingSerializerMixin, CachedListMixin, ListAPIView):
+    """
+    View для вывода списка сотрудников в порядке убывания количества активных задач.
+    Вложенные задачи можно ограничить параметрами:
+    - tasks_status: статусы задач через запятую (например, in_progress)
+    - tasks_limit: количество первых задач по сроку выполнения
+    Ответы кэшируются.
+    """
 
     serializer_class = EmployeeTasksSerializer
+    pagination_class = CustomPagination
     permission_classes = (AllowAny,)
 
+    max_tasks_limit = 100
+
+    def get_tasks_queryset(self):
+        """Задачи сотрудников с учетом параметров запроса"""
+        tasks = Task.objects.order_by(F("deadline").asc(nulls_last=True), "id")
+
+        statuses = self.request.query_params.get("tasks_status")
+        if statuses:
+            statuses = statuses.split(",")
+            allowed = dict(Task.STATUS_CHOICES)
+            if not set(statuses) <= allowed.keys():
+                raise ValidationError(
+                    {"tasks_status": f"Допустимые статусы: {', '.join(allowed)}"}
+                )
+            tasks = tasks.filter(status__in=statuses)
+
+        if self.request.query_params.get("tasks_limit"):
+            limit = int_query_param(
+                self.request, "tasks_limit", None, 1, self.max_tasks_limit
+            )
+            tasks = tasks[:limit]
+        return tasks
+
     # queryset сотрудников отсортированный по количеству активных задач
     def get_queryset(self):
-        return Employee.objects.annotate(
-            active_task_count=Count("tasks", filter=Q(tasks__status="in_progress"))
-        ).order_by("-active_task_count")
+        return (
+            Employee.objects.with_task_count()
+            .order_by("-active_task_count", "id")
+            .prefetch_related(
+                Prefetch(
+                    "tasks",
+                    queryset=self.get_tasks_queryset(),
+                    to_attr="selected_tasks",
+                )
+            )
+        )
 
 
-class ImportantTasksAPIView(ListAPIView):
-    """View для вывода списка важных задач с сотрудниками для их выполнения"""
+class ImportantTasksAPIView(ServerTimingSerializerMixin, CachedListMixin, ListAPIView):
+    """
+    View для вывода списка важных задач с сотрудниками для их выполнения
+    (ответы кэшируются)
+    """
 
     serializer_class = ImportantTaskSerializer
     permission_classes = (AllowAny,)
@@ -103,14 +312,63 @@ class ImportantTasksAPIView(ListAPIView):
         - У которых есть родительская задача
         - Родительская задача или её подзадачи в статусе "in_progress"
         """
-        return (
-            Task.objects.filter(
-                status="new",
-                parent_task__isnull=False,
-            )
-            .filter(
-                Q(parent_task__status="in_progress")
-                | Q(parent_task__subtasks__status="in_progress")
+        return Task.objects.select_related("parent_task__executor").important()
+
+    def get_serializer_context(self):
+        """
+        Добавляет в контекст снимок загруженности сотрудников,
+        общий для всех задач в ответе
+        """
+        context = super().get_serializer_context()
+        context["workload"] = EmployeesWorkload.load()
+        return context
+
+
+class TaskAssignmentAPIView(APIView):
+    """
+    View сбалансированного распределения важных задач между сотрудниками:
+    GET возвращает план, POST назначает исполнителей по плану одним UPDATE
+    """
+
+    def get_permissions(self):
+        if self.request.method == "POST":
+            self.permission_classes = (IsAuthenticated, IsModer)
+        else:
+            self.permission_classes = (AllowAny,)
+        return super().get_permissions()
+
+    def get(self, request):
+        return Response(assignment_plan())
+
+    def post(self, request):
+        with transaction.atomic():
+            assignments = assignment_plan()
+            updated = apply_assignment_plan(assignments)
+        return Response({"updated": updated, "assignments": assignments})
+
+
+class TaskStatisticsAPIView(APIView):
+    """
+    View статистики задач по исполнителям и в целом: статусы, просроченные задачи
+    и сроки выполнения. Вычисляется одним запросом и кэшируется на
+    TASK_STATISTICS_CACHE_TIMEOUT секунд (или до изменения задач)
+    """
+
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        key = response_cache.make_key("task-statistics", request)
+        return Response(
+            response_cache.remember(
+                key, task_statistics, timeout=settings.TASK_STATISTICS_CACHE_TIMEOUT
             )
-            .distinct()
         )
+
+
+class ResponseCacheStatsAPIView(APIView):
+    """View счетчиков попаданий и промахов кэша ответов списков"""
+
+    permission_classes = (IsAuthenticated, IsModer)
+
+    def get(self, request):
+        return Response(response_cache.stats())
@@ -0,0 +1,74 @@
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+from users.roles import MODERATOR_CLAIM, ROLES_VERSION_CLAIM
+
+# Claims, без которых пользователь загружается из БД
+REQUIRED_CLAIMS = ("email", "is_superuser", MODERATOR_CLAIM, ROLES_VERSION_CLAIM)
+
+
+class ClaimsUser(TokenUser):
+    """
+    Пользователь из claims токена доступа (id, почта, суперпользователь, роль).
+    Остальные claims доступны как атрибуты, прочие поля берутся из модели
+    пользователя, которая загружается из БД только при первом обращении к ним.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token["email"]
+
+    @cached_property
+    def is_superuser(self):
+        return self.token["is_superuser"]
+
+    @cached_property
+    def instance(self):
+        """Полная модель пользователя"""
+        try:
+            return User.objects.get(pk=self.pk)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("Пользователь не найден.", code="user_not_found")
+
+    def get_username(self):
+        return self.email
+
+    def __str__(self):
+        return self.email
+
+    def __getattr__(self, attr):
+        if attr.startswith("_") or attr == "token":
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+    def __eq__(self, other):
+        # Сравнение с моделью пользователя (например, в IsSelf и IsOwner)
+        if isinstance(other, User):
+            return self.pk == other.pk
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без загрузки пользователя из БД.
+    Пользователь строится из claims токена доступа (см. JWT_ROLE_CLAIM);
+    для токенов без этих claims пользователь загружается из БД как обычно.
+    Изменения пользователя (блокировка, удаление) учитываются после
+    истечения токена доступа.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token or not all(
+            claim in validated_token for claim in REQUIRED_CLAIMS
+        ):
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
@@ -0,0 +1,109 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, DateTimeField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Буфер времени входа пользователей в памяти процесса.
+    Накопленные значения записываются одним UPDATE по таймеру
+    (LAST_LOGIN_FLUSH_INTERVAL) или при LAST_LOGIN_FLUSH_SIZE пользователей.
+    Каждый процесс пишет свой буфер; last_login только увеличивается,
+    поэтому процессы не затирают более позднее время входа друг друга.
+    Не записанные значения теряются только при аварийном завершении процесса.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.timer = None
+
+    def add(self, user_id, timestamp=None):
+        with self.lock:
+            self.merge({user_id: timestamp or timezone.now()})
+            full = len(self.pending) >= settings.LAST_LOGIN_FLUSH_SIZE
+            if not full and self.timer is None:
+                self.timer = threading.Timer(
+                    settings.LAST_LOGIN_FLUSH_INTERVAL, self.flush_in_thread
+                )
+                self.timer.daemon = True
+                self.timer.start()
+        if full:
+            self.flush()
+
+    def merge(self, values):
+        """Добавляет значения в буфер, оставляя более позднее время входа"""
+        for user_id, timestamp in values.items():
+            if user_id not in self.pending or self.pending[user_id] < timestamp:
+                self.pending[user_id] = timestamp
+
+    def take(self):
+        """Забирает накопленные значения и останавливает таймер"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        return pending
+
+    def flush(self):
+        """
+        Записывает накопленное время входа одним UPDATE.
+        :returns: количество обновленных пользователей
+        """
+        pending = self.take()
+        if not pending:
+            return 0
+        last_login = Case(
+            *(When(pk=pk, then=Value(value)) for pk, value in pending.items()),
+            output_field=DateTimeField(),
+        )
+        try:
+            with transaction.atomic():
+                # Строки блокируются по порядку id, чтобы процессы не ждали друг друга по кругу
+                users = User.objects.filter(pk__in=pending).order_by("pk")
+                list(users.select_for_update().values_list("pk", flat=True))
+                return users.update(
+                    last_login=Greatest(Coalesce("last_login", last_login), last_login)
+                )
+        except DatabaseError:
+            # Значения возвращаются в буфер до следующей записи
+            with self.lock:
+                self.merge(pending)
+            raise
+
+    def flush_in_thread(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Не удалось записать время входа пользователей")
+        finally:
+            connections.close_all()
+
+
+last_login_buffer = LastLoginBuffer()
+
+# Дочерний процесс (fork) начинает с пустым буфером без таймера родителя
+os.register_at_fork(after_in_child=last_login_buffer.reset)
+
+
+@atexit.register
+def flush_on_exit():
+    try:
+        last_login_buffer.flush()
+    except Exception:
+        logger.exception("Не удалось записать время входа пользователей")
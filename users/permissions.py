@@ -1,14 +1,16 @@
 from rest_framework import permissions
 
+from users.roles import is_moderator
+
 
 class IsModer(permissions.BasePermission):
-    """Проверяет, является ли пользователь модератором или суперпользователем."""
+    """
+    Проверяет, является ли пользователь модератором или суперпользователем.
+    Роль вычисляется один раз на запрос (см. users.roles).
+    """
 
     def has_permission(self, request, view):
-        return (
-            request.user.is_superuser  # Суперпользователь
-            or request.user.groups.filter(name="moderators").exists()  # Модератор
-        )
+        return is_moderator(request)
 
 
 class IsSelf(permissions.BasePermission):
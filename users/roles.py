@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from tracker.cache import CacheVersion
+
+MODERATORS_GROUP = "moderators"
+
+# Claim токена доступа с ролью модератора и версией ролей на момент выдачи
+MODERATOR_CLAIM = "is_moderator"
+ROLES_VERSION_CLAIM = "roles_version"
+
+# Версия ролей: входит в ключи кэша ролей и в claim токена
+ROLES_VERSION = CacheVersion("users:roles:version")
+
+# Кэши в памяти процесса: изменение групп в одном процессе не видно остальным
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def roles_cache_shared():
+    """
+    Общий ли кэш для всех процессов (ROLES_CACHE_SHARED, по умолчанию по бэкенду).
+    Без общего кэша роли не кэшируются и claims роли в токенах не учитываются:
+    иначе исключенный из группы модератор сохранял бы права в других процессах.
+    """
+    if settings.ROLES_CACHE_SHARED is not None:
+        return settings.ROLES_CACHE_SHARED
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_CACHES)
+
+
+def roles_version():
+    """Версия ролей пользователей; увеличивается при изменении групп"""
+    return ROLES_VERSION.get()
+
+
+def invalidate_roles():
+    """Делает недействительными сохраненные роли и claims выданных токенов"""
+    ROLES_VERSION.invalidate()
+
+
+def get_token_claims(user):
+    """Claims пользователя и роли для токена доступа"""
+    return {
+        "email": user.email,
+        "is_superuser": user.is_superuser,
+        MODERATOR_CLAIM: is_moderator_user(user),
+        ROLES_VERSION_CLAIM: roles_version(),
+    }
+
+
+def is_moderator_user(user):
+    """
+    Является ли пользователь модератором или суперпользователем.
+    Членство в группе хранится в общем кэше до изменения групп.
+    """
+    if not user.is_authenticated:
+        return False
+    if user.is_superuser:
+        return True
+    # По id, чтобы работало и для пользователя из claims токена
+    moderators = Group.objects.filter(name=MODERATORS_GROUP, user__pk=user.pk)
+    if not roles_cache_shared():
+        return moderators.exists()
+    key = f"users:roles:{roles_version()}:{user.pk}:moderator"
+    moderator = cache.get(key)
+    if moderator is None:
+        moderator = moderators.exists()
+        cache.set(key, moderator, timeout=settings.ROLES_CACHE_TIMEOUT)
+    return moderator
+
+
+def is_moderator(request):
+    """
+    Роль модератора пользователя запроса, вычисляется один раз на запрос.
+    Если в токене доступа есть claim роли актуальной версии и кэш общий,
+    БД не используется.
+    """
+    if not hasattr(request, "_is_moderator"):
+        token = request.auth
+        claims = token if hasattr(token, "get") else {}
+        if (
+            roles_cache_shared()
+            and claims.get(MODERATOR_CLAIM) is not None
+            and claims.get(ROLES_VERSION_CLAIM) == roles_version()
+        ):
+            request._is_moderator = bool(claims[MODERATOR_CLAIM])
+        else:
+            request._is_moderator = is_moderator_user(request.user)
+    return request._is_moderator
@@ -1,6 +1,12 @@
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (TokenObtainPairSerializer,
+                                                  TokenObtainSerializer)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
+from users.last_login import last_login_buffer
 from users.models import User
+from users.roles import get_token_claims
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -36,3 +42,32 @@ class UserPublicSerializer(serializers.ModelSerializer):
             "avatar",
             "tg_chat_id",
         )
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Сериализатор получения токенов. При JWT_ROLE_CLAIM добавляет в токены
+    почту, признак суперпользователя и роль модератора, чтобы проверки прав
+    и аутентификация без состояния не обращались к БД.
+    При LAST_LOGIN_BUFFER время входа записывается в БД пакетами
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if settings.JWT_ROLE_CLAIM:
+            for claim, value in get_token_claims(user).items():
+                token[claim] = value
+        return token
+
+    def validate(self, attrs):
+        if not settings.LAST_LOGIN_BUFFER:
+            return super().validate(attrs)
+        # Как TokenObtainPairSerializer.validate, но last_login пишется через буфер
+        data = TokenObtainSerializer.validate(self, attrs)
+        refresh = self.get_token(self.user)
+        data["refresh"] = str(refresh)
+        data["access"] = str(refresh.access_token)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            last_login_buffer.add(self.user.pk)
+        return data
@@ -0,0 +1,40 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from users.models import User
+from users.roles import invalidate_roles
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_membership(sender, action, **kwargs):
+    """Сбрасывает роли при добавлении и удалении пользователей из групп"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_roles()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_roles_on_group(sender, **kwargs):
+    """Сбрасывает роли при переименовании и удалении групп"""
+    invalidate_roles()
+
+
+@receiver(pre_save, sender=User)
+def invalidate_roles_on_superuser(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает роли при изменении признака суперпользователя:
+    claim роли модератора в токенах учитывает и его
+    """
+    if instance.pk is None or (
+        update_fields is not None and "is_superuser" not in update_fields
+    ):
+        return
+    was_superuser = (
+        User.objects.filter(pk=instance.pk)
+        .values_list("is_superuser", flat=True)
+        .first()
+    )
+    if was_superuser is not None and was_superuser != instance.is_superuser:
+        invalidate_roles()
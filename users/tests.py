@@ -1,9 +1,21 @@
+from io import StringIO
+
 from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 
+from users.authentication import StatelessJWTAuthentication
+from users.last_login import last_login_buffer
 from users.models import User
+from users.roles import roles_cache_shared
+from users.serializers import RoleTokenObtainPairSerializer
 
 
 class BaseAPITestCase(APITestCase):
@@ -140,3 +152,172 @@ class UserTests(BaseAPITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+
+
+# Тесты выполняются в одном процессе: кэш в памяти процесса для них общий
+@override_settings(ROLES_CACHE_SHARED=True)
+class ModeratorRoleTests(BaseAPITestCase):
+    """
+    Тесты определения роли модератора без повторных запросов к группам.
+    """
+
+    def group_queries(self, queries):
+        return [query for query in queries if "auth_group" in query["sql"]]
+
+    def login(self, user):
+        response = self.client.post(
+            reverse("users:login"), {"email": user.email, "password": "pass"}
+        )
+        self.assertIn("is_moderator", AccessToken(response.data["access"]))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_role_from_token_claim(self):
+        """Тест: роль модератора читается из токена без запросов к группам."""
+        self.login(self.moderator)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("users:user-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.group_queries(queries), [])
+
+    def test_role_claim_invalidated_on_group_change(self):
+        """Тест: после исключения из группы claim токена не используется."""
+        self.login(self.moderator)
+        self.moderator.groups.remove(self.moder_group)
+        response = self.client.get(reverse("users:user-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.login(self.user)
+        self.moder_group.user_set.add(self.user)
+        response = self.client.get(reverse("users:user-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_role_claim_invalidated_on_superuser_change(self):
+        """Тест: после снятия признака суперпользователя claim токена не используется."""
+        admin = User.objects.create_superuser(email="admin@mail.ru", password="pass")
+        self.login(admin)
+        response = self.client.get(reverse("users:user-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        admin.is_superuser = False
+        admin.save()
+        response = self.client.get(reverse("users:user-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_role_resolved_once_per_request(self):
+        """Тест: IsModer | IsSelf проверяет группы один раз, затем роль в кэше."""
+        self.client.force_authenticate(user=self.moderator)
+        url = reverse("users:user-retrieve", args=[self.user.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.group_queries(queries)), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.delete(reverse("users:user-delete", args=[self.owner.pk]))
+        self.assertEqual(self.group_queries(queries), [])
+
+    @override_settings(ROLES_CACHE_SHARED=None)
+    def test_role_not_cached_in_process_local_cache(self):
+        """Тест: с кэшем в памяти процесса claim и кэш роли не используются."""
+        with override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            }
+        ):
+            self.assertFalse(roles_cache_shared())
+            self.login(self.moderator)
+            for _ in range(2):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse("users:user-list"))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(self.group_queries(queries)), 1)
+
+
+class StatelessJWTAuthenticationTests(BaseAPITestCase):
+    """
+    Тесты аутентификации по claims токена без загрузки пользователя.
+    """
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_user_from_claims(self):
+        """Тест: пользователь строится из claims, модель загружается по требованию."""
+        token = RoleTokenObtainPairSerializer.get_token(self.moderator).access_token
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+            self.assertEqual(user.pk, self.moderator.pk)
+            self.assertEqual(user.email, "moderator@mail.ru")
+            self.assertFalse(user.is_superuser)
+            self.assertTrue(user.is_moderator)
+            self.assertEqual(user, self.moderator)
+            self.assertEqual(self.moderator, user)
+        with self.assertNumQueries(1):
+            self.assertIsNone(user.city)
+            self.assertIsNone(user.phone)
+
+    def test_token_without_claims(self):
+        """Тест: для токена без claims пользователь загружается из БД."""
+        token = AccessToken.for_user(self.user)
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(token)
+        self.assertIsInstance(user, User)
+
+    def test_benchmark_auth_command(self):
+        """Тест: команда сравнения аутентификации."""
+        stdout = StringIO()
+        call_command("benchmark_auth", "--requests", 1, stdout=stdout)
+        self.assertIn(
+            "StatelessJWTAuthentication /task-list/: запросов к БД 0", stdout.getvalue()
+        )
+
+
+@override_settings(
+    LAST_LOGIN_BUFFER=True,
+    LAST_LOGIN_FLUSH_INTERVAL=3600,
+)
+class LastLoginBufferTests(BaseAPITestCase):
+    """
+    Тесты пакетной записи времени входа.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(last_login_buffer.take)
+
+    def login(self, user):
+        response = self.client.post(
+            reverse("users:login"), {"email": user.email, "password": "pass"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_last_login_flushed_in_batch(self):
+        """Тест: время входа записывается одним UPDATE при сбросе буфера."""
+        self.login(self.user)
+        self.login(self.owner)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(last_login_buffer.flush(), 2)
+        updates = [query for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(User.objects.filter(last_login__isnull=False).count(), 2)
+
+    def test_last_login_not_moved_back(self):
+        """Тест: более позднее время входа из другого процесса не затирается."""
+        later = timezone.now() + timezone.timedelta(minutes=1)
+        User.objects.filter(pk=self.user.pk).update(last_login=later)
+        last_login_buffer.add(self.user.pk)
+        last_login_buffer.flush()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, later)
+
+    @override_settings(LAST_LOGIN_FLUSH_SIZE=2)
+    def test_last_login_flushed_on_size(self):
+        """Тест: буфер записывается при достижении размера пакета."""
+        self.login(self.user)
+        self.assertIsNone(User.objects.get(pk=self.user.pk).last_login)
+        self.login(self.owner)
+        self.assertIsNotNone(User.objects.get(pk=self.user.pk).last_login)
+        self.assertEqual(last_login_buffer.pending, {})